@@ -0,0 +1,76 @@
+# admission.py
+import os
+import tempfile
+import threading
+import logging
+from functools import wraps
+from flask import Request, request, jsonify
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+# Bodies above this size are spooled to disk instead of held in memory
+UPLOAD_SPOOL_THRESHOLD = int(os.getenv("UPLOAD_SPOOL_THRESHOLD", str(512 * 1024)))
+UPLOAD_SPOOL_DIR = os.getenv("UPLOAD_SPOOL_DIR") or None
+
+# Hard cap enforced by Werkzeug for every route, including chunked uploads
+MAX_CONTENT_LENGTH = int(os.getenv("MAX_CONTENT_LENGTH", str(32 * MB)))
+
+# Default limits for the heavy routes; each value can be overridden with
+# LIMIT_<ENDPOINT>_CONCURRENCY, LIMIT_<ENDPOINT>_MAX_BYTES and
+# LIMIT_<ENDPOINT>_RETRY_AFTER (e.g. LIMIT_TRANSCRIBE_CONCURRENCY=8)
+DEFAULT_LIMITS = {
+    "transcribe": {"concurrency": 4, "max_bytes": 25 * MB, "retry_after": 5},
+    "analyze_text": {"concurrency": 2, "max_bytes": 1 * MB, "retry_after": 10},
+    "analyze_response": {"concurrency": 2, "max_bytes": 10 * MB, "retry_after": 10},
+    "upload_resume": {"concurrency": 4, "max_bytes": 5 * MB, "retry_after": 5},
+}
+
+
+def endpoint_limits(name):
+    limits = dict(DEFAULT_LIMITS.get(name, {"concurrency": 4, "max_bytes": MAX_CONTENT_LENGTH, "retry_after": 5}))
+    for key in limits:
+        value = os.getenv(f"LIMIT_{name.upper()}_{key.upper()}")
+        if value:
+            limits[key] = int(value)
+    return limits
+
+
+class SpoolingRequest(Request):
+    """Request whose uploaded files go to disk once they pass the spool threshold"""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_THRESHOLD, dir=UPLOAD_SPOOL_DIR)
+
+
+def admission_controlled(name):
+    """Reject oversized bodies with 413 and excess concurrent calls with 429.
+
+    Checks happen before the body is parsed, so rejected requests cost almost
+    nothing.
+    """
+    limits = endpoint_limits(name)
+    slots = threading.BoundedSemaphore(limits["concurrency"])
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.content_length is not None and request.content_length > limits["max_bytes"]:
+                return jsonify({
+                    "error": f"Request body too large (limit {limits['max_bytes']} bytes)"
+                }), 413
+
+            if not slots.acquire(blocking=False):
+                logger.warning("Rejecting %s: %d requests already in progress", name, limits["concurrency"])
+                response = jsonify({"error": "Server is busy, please retry shortly"})
+                response.status_code = 429
+                response.headers["Retry-After"] = str(limits["retry_after"])
+                return response
+
+            try:
+                return view(*args, **kwargs)
+            finally:
+                slots.release()
+        return wrapper
+    return decorator
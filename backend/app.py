@@ -1,44 +1,73 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, send_from_directory, abort, make_response
 from flask_cors import CORS
-from pymongo import MongoClient
+from pymongo import MongoClient, ReturnDocument
 from dotenv import load_dotenv
 import os
 import time
 import bcrypt
-import fitz  # PyMuPDF
-import spacy
 import re
 import nltk
-from nltk.corpus import stopwords
-import random
 import tempfile
-import openpyxl
-import fitz  # PyMuPDF
 import hashlib
+import gzip
+from functools import wraps
 from bson import ObjectId
 import datetime
-from audio_transcriber import transcribe_audio_file
+import logging
+import threading
+from werkzeug.utils import secure_filename
+from audio_transcriber import transcribe_audio_file, batcher as transcription_batcher
+from transcription_cache import transcription_cache
+from question_bank import (load_questions_from_excel, new_question_seed, plan_skills,
+                           new_session, question_at, questions_for_plan)
+from resume_processor import get_nlp, process_resume
+from question_index import get_question_index
 from response_analyzer import ResponseAnalyzer
+from request_profiler import profiled, attach_profile_header, is_profile_admin, profile_helper_thread, PROFILE_DIR
+from admission import admission_controlled, SpoolingRequest, MAX_CONTENT_LENGTH
+from progress import record_interview_progress, summarize_progress, PROGRESS_PROJECTION
+from transcript_store import compact_transcript, has_verbose_data, store_raw_transcript, load_raw_transcripts
 
 # Initialize and load resources
-nltk.download('stopwords')
-nlp = spacy.load("en_core_web_sm")
 load_dotenv()
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+nltk.download('stopwords', quiet=True)
+get_nlp()
 
 app = Flask(__name__)
-CORS(app)
+app.request_class = SpoolingRequest
+app.config['MAX_CONTENT_LENGTH'] = MAX_CONTENT_LENGTH
+CORS(app, expose_headers=["X-Profile-Id", "X-Profile-Mode", "Retry-After"])
+app.after_request(attach_profile_header)
+# ASR runs on the batcher thread, so sample it when /transcribe is profiled
+profile_helper_thread('transcribe', transcription_batcher.thread)
 
 # MongoDB connection
 client = MongoClient(os.getenv("MONGO_URI"))
 db = client.mock_interviews
 users_collection = db.users
 interviews_collection = db.interviews
-
-# ======== SKILLS DB ===========
-SKILLS_DB = {"python", "java", "c", "c++", "javascript", "react", "html", "css", 
-             "node.js", "express.js", "mongodb", "sql", "mysql", "django", "flask", 
-             "aws", "azure", "docker", "kubernetes", "pandas", "numpy", "tensorflow", 
-             "keras", "machine learning", "nlp", "deep learning"}
+interviews_collection.create_index("user_email")
+# One precomputed rollup document per user, updated as interviews complete
+progress_collection = db.user_progress
+progress_collection.create_index("user_email", unique=True)
+# Verbose Whisper output, compressed, kept out of the interview documents
+raw_transcripts_collection = db.raw_transcripts
+raw_transcripts_collection.create_index([("interview_id", 1), ("key", 1)], unique=True)
+
+if os.getenv("TRANSCRIPTION_CACHE_MONGO", "").lower() in ("1", "true", "yes"):
+    transcription_cache.use_collection(db.transcription_cache)
+
+# Vectorize the question bank once at startup
+try:
+    get_question_index()
+except Exception as e:
+    logger.warning("Question index not built at startup: %s", e)
 
 # ======== HELPERS ============
 
@@ -48,86 +77,65 @@ def hash_password(password):
 def verify_password(stored_password, provided_password):
     return bcrypt.checkpw(provided_password.encode('utf-8'), stored_password)
 
-def extract_text_from_pdf(pdf_path):
-    doc = fitz.open(pdf_path)
-    return " ".join([page.get_text("text") for page in doc])
-
-def preprocess_text(text):
-    text = text.lower()
-    text = re.sub(r'[^a-z\s]', '', text)
-    words = text.split()
-    return " ".join([w for w in words if w not in stopwords.words('english')])
-
-def extract_skills(text):
-    doc = nlp(text)
-    found = set()
-    for token in doc:
-        if token.text in SKILLS_DB:
-            found.add(token.text)
-    for chunk in doc.noun_chunks:
-        if chunk.text in SKILLS_DB:
-            found.add(chunk.text)
-    return list(found)
-
-def process_resume(path):
-    raw = extract_text_from_pdf(path)
-    cleaned = preprocess_text(raw)
-    return extract_skills(cleaned)
-
-def load_questions_from_excel(file_path='qstns.xlsx'):
-    """Load questions from Excel file with proper error handling"""
-    qdict = {}
-    try:
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"Excel file not found at {os.path.abspath(file_path)}")
-            
-        wb = openpyxl.load_workbook(file_path)
-        sheet = wb.active
-        
-        for i, row in enumerate(sheet.iter_rows(min_row=2, values_only=True), start=2):
-            skill = str(row[0]).lower().strip() if row[0] else None
-            question = str(row[1]).strip() if row[1] else None
-            
-            # Remove numbers and dots/colons at the start of questions
-            if question:
-                # This regex removes leading numbers followed by punctuation and spaces
-                question = re.sub(r'^\d+[.:]\s*', '', question).strip()
-            
-            if skill and question:
-                if skill not in qdict:
-                    qdict[skill] = []
-                qdict[skill].append(question)
-        
-        if not qdict:
-            raise ValueError("Excel file contains no valid questions")
-            
-        return qdict
-    except Exception as e:
-        raise ValueError(f"Could not load questions: {str(e)}")
+_analyzer = None
+_analyzer_lock = threading.Lock()
+
+def get_analyzer():
+    """Shared analyzer, so requests reuse one LanguageTool server instead of starting a JVM each"""
+    global _analyzer
+    if _analyzer is None:
+        with _analyzer_lock:
+            if _analyzer is None:
+                _analyzer = ResponseAnalyzer()
+    return _analyzer
 
-def generate_questions(skills):
+def plan_questions(skills):
+    """Pick the session's skills and shuffle seed; questions are produced on demand"""
     try:
-        all_questions = load_questions_from_excel()
-        questions = {}
+        seed = new_question_seed()
+        planned_skills = plan_skills(skills, seed)
         
-        # Shuffle the skills to randomize their order
-        shuffled_skills = random.sample(skills, len(skills))
+        logger.debug("Found questions for: %s", planned_skills)
         
-        for skill in shuffled_skills:
-            sk = skill.lower()
-            if sk in all_questions:
-                # Shuffle the questions for each skill
-                questions[skill] = random.sample(all_questions[sk], len(all_questions[sk]))
-        
-        print(f"[DEBUG] Found questions for: {list(questions.keys())}")
-        
-        if not questions:
+        if not planned_skills:
             raise ValueError("No questions available for any of your skills")
         
-        return questions
+        return planned_skills, seed
     except Exception as e:
         raise ValueError(f"Question generation failed: {str(e)}")
 
+def session_question(session, position):
+    """Question at a position for both seeded sessions and ones storing the full list"""
+    if "question_seed" in session:
+        return question_at(session["skills"], session["question_seed"], position)
+    for skill_index, skill in enumerate(session.get("skills", [])):
+        questions = session.get("questions", {}).get(skill, [])
+        if position < len(questions):
+            return {
+                "skill": skill,
+                "question": questions[position],
+                "skill_index": skill_index,
+                "question_index": position,
+                "skill_question_count": len(questions)
+            }
+        position -= len(questions)
+    return None
+
+def compressed(view):
+    """Gzip larger JSON responses when the client accepts it"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        response = make_response(view(*args, **kwargs))
+        if (response.status_code == 200
+                and 'gzip' in request.headers.get('Accept-Encoding', '')
+                and not response.direct_passthrough
+                and response.content_length and response.content_length >= 1024):
+            response.set_data(gzip.compress(response.get_data(), compresslevel=6))
+            response.headers['Content-Encoding'] = 'gzip'
+            response.vary.add('Accept-Encoding')
+        return response
+    return wrapper
+
 def is_strong_password(password):
     return (
         len(password) >= 8 and
@@ -179,6 +187,8 @@ def login():
     }), 200
 
 @app.route('/upload-resume', methods=['POST'])
+@admission_controlled('upload_resume')
+@compressed
 def upload_resume():
     if 'file' not in request.files:
         return jsonify({"error": "No file uploaded"}), 400
@@ -195,22 +205,16 @@ def upload_resume():
         if not skills:
             return jsonify({"error": "No skills found in resume"}), 400
 
-        questions = generate_questions(skills)
+        planned_skills, seed = plan_questions(skills)
         
-        session = {
-            "skills": list(questions.keys()),
-            "questions": questions,
-            "status": "started",
-            "transcript": [],
-            "created_at": datetime.datetime.utcnow()
-        }
+        session = new_session(planned_skills, seed, request.form.get("email", "").strip() or None)
         
         result = interviews_collection.insert_one(session)
         
         return jsonify({
             "session_id": str(result.inserted_id),
-            "skills": list(questions.keys()),
-            "questions": questions
+            "skills": planned_skills,
+            "total_questions": session["question_total"]
         })
 
     except ValueError as e:
@@ -225,6 +229,7 @@ def upload_resume():
                 pass
 
 @app.route('/get-questions', methods=['POST'])
+@compressed
 def get_questions():
     data = request.json
     session_id = data.get("session_id")
@@ -232,25 +237,79 @@ def get_questions():
         return jsonify({"error": "Session ID is required"}), 400
 
     try:
-        session = interviews_collection.find_one({"_id": ObjectId(session_id)})
+        session = interviews_collection.find_one(
+            {"_id": ObjectId(session_id)},
+            {"skills": 1, "questions": 1, "question_seed": 1}
+        )
         if not session:
             return jsonify({"error": "Session not found"}), 404
 
+        if "question_seed" in session:
+            questions = questions_for_plan(session["skills"], session["question_seed"])
+        else:
+            questions = session.get("questions", {})
+
         return jsonify({
-            "questions": session.get("questions", {}),
+            "questions": questions,
             "skills": session.get("skills", [])
         })
     except Exception as e:
         return jsonify({"error": str(e)}), 500
+
+@app.route('/next-question', methods=['POST'])
+def next_question():
+    """Hand out the session's next question and advance its cursor.
+
+    Passing "position" re-reads that question without moving the cursor, so a
+    reloaded client can resume where it was.
+    """
+    data = request.json
+    session_id = data.get("session_id")
+    if not session_id:
+        return jsonify({"error": "Session ID is required"}), 400
+
+    try:
+        projection = {"skills": 1, "questions": 1, "question_seed": 1, "question_cursor": 1, "question_total": 1}
+        position = data.get("position")
+        if position is None:
+            session = interviews_collection.find_one_and_update(
+                {"_id": ObjectId(session_id)},
+                {"$inc": {"question_cursor": 1}},
+                projection=projection
+            )
+            if session:
+                position = session.get("question_cursor", 0)
+        else:
+            position = int(position)
+            session = interviews_collection.find_one({"_id": ObjectId(session_id)}, projection)
+
+        if not session:
+            return jsonify({"error": "Session not found"}), 404
+
+        total = session.get("question_total")
+        if total is None:
+            total = sum(len(q) for q in session.get("questions", {}).values())
+
+        question = session_question(session, position) if position >= 0 else None
+        if question is None:
+            return jsonify({"done": True, "position": position, "total": total})
+
+        question.update({"done": False, "position": position, "total": total})
+        return jsonify(question)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 # In your Flask backend (app.py or similar)
 @app.route('/analyze-text', methods=['POST'])
+@admission_controlled('analyze_text')
+@profiled
 def analyze_text():
     try:
         data = request.get_json()
-        print("\n=== Received data for analysis ===")
+        logger.debug("Received data for analysis")
         
         if not data or 'text' not in data:
-            print("Error: Missing 'text' in request")
+            logger.warning("Missing 'text' in analysis request")
             return jsonify({"status": "error", "message": "Text is required"}), 400
             
         text = data['text']
@@ -260,35 +319,45 @@ def analyze_text():
         analysis_results = None
         if session_id and session_id != 'unknown':
             try:
-                interview = interviews_collection.find_one({"_id": ObjectId(session_id)})
+                interview = interviews_collection.find_one({"_id": ObjectId(session_id)}, {"analysis": 1})
                 if interview and interview.get("analysis"):
-                    print("Returning existing analysis from database")
+                    logger.debug("Returning existing analysis for session %s", session_id)
                     return jsonify({
                         "status": "success",
                         "analysis": interview["analysis"]
                     })
             except:
                 # If session_id is invalid, just proceed with new analysis
-                print(f"Invalid session_id format: {session_id}")
+                logger.warning("Invalid session_id format: %s", session_id)
         
-        print(f"Text length: {len(text)} characters")
+        logger.debug("Text length: %d characters", len(text))
         
         # Initialize analyzer
-        analyzer = ResponseAnalyzer()
+        analyzer = get_analyzer()
         
         # Perform analysis
-        analysis_results = analyzer.analyze_text_response(text)
+        answers = data.get('answers')
+        analysis_results = analyzer.analyze_text_response(
+            text,
+            answers=[a.get('answer') or '' for a in answers] if answers else None
+        )
         
         if "error" in analysis_results:
-            print(f"Analysis error: {analysis_results['error']}")
+            logger.error("Analysis error: %s", analysis_results['error'])
             return jsonify({
                 "status": "error",
                 "message": analysis_results['error'],
                 "traceback": analysis_results.get('traceback', '')
             }), 500
         
-        print("\n=== Analysis Results ===")
-        print(f"Overall Score: {analysis_results['scores']['overall_score']}")
+        # Score how well each answer addresses the question it was given
+        if answers:
+            try:
+                analysis_results["relevance_analysis"] = get_question_index().score_answers(answers)
+            except Exception:
+                logger.exception("Relevance scoring failed")
+
+        logger.debug("Overall score: %s", analysis_results['scores']['overall_score'])
         
         # Store the analysis in the database if we have a valid session_id
         if session_id and session_id != 'unknown':
@@ -297,9 +366,9 @@ def analyze_text():
                     {"_id": ObjectId(session_id)},
                     {"$set": {"analysis": analysis_results}}
                 )
-                print("Analysis results stored in database")
+                logger.debug("Analysis results stored for session %s", session_id)
             except:
-                print("Could not store analysis in database - invalid session_id")
+                logger.warning("Could not store analysis in database - invalid session_id %s", session_id)
         
         return jsonify({
             "status": "success",
@@ -307,12 +376,13 @@ def analyze_text():
         })
         
     except Exception as e:
-        print(f"Error during analysis: {str(e)}")
+        logger.exception("Error during analysis")
         return jsonify({
             "status": "error",
             "message": str(e)
         }), 500
 @app.route('/analyze-response', methods=['POST'])
+@admission_controlled('analyze_response')
 def analyze_response():
     if 'file' not in request.files:
         return jsonify({"error": "No file uploaded"}), 400
@@ -327,7 +397,7 @@ def analyze_response():
             file.save(temp_file.name)
             
             # Initialize and use the analyzer
-            analyzer = ResponseAnalyzer()
+            analyzer = get_analyzer()
             analysis_results = analyzer.analyze_response(temp_file.name)
             
             if "error" in analysis_results:
@@ -379,6 +449,8 @@ def analyze_response():
             except:
                 pass
 @app.route("/transcribe", methods=["POST"])
+@admission_controlled('transcribe')
+@profiled
 def transcribe():
     if "audio" not in request.files:
         return jsonify({"error": "No audio file provided"}), 400
@@ -401,18 +473,30 @@ def transcribe():
             return jsonify(result), 500
         return jsonify(result)
     except Exception as e:
+        logger.exception("Transcription failed")
         return jsonify({
             "error": f"Transcription failed: {str(e)}",
             "pauses": [],
             "segments": [],
             "text": ""
         }), 500
+@app.errorhandler(413)
+def request_too_large(e):
+    return jsonify({"error": f"Request body too large (limit {MAX_CONTENT_LENGTH} bytes)"}), 413
+
+@app.route('/profiles/<name>', methods=['GET'])
+def download_profile(name):
+    """Download a stored request profile (admin only)"""
+    if not is_profile_admin():
+        abort(403)
+    return send_from_directory(PROFILE_DIR, secure_filename(name), as_attachment=True)
+
 @app.route('/test-analysis', methods=['GET'])
 def test_analysis():
     try:
         test_text = "This is a test sentence. It contains some basic English words. The grammar should be correct."
         
-        analyzer = ResponseAnalyzer()
+        analyzer = get_analyzer()
         results = analyzer.analyze_grammar(test_text)
         
         return jsonify({
@@ -449,7 +533,7 @@ def check_analysis_status():
         if not session_id:
             return jsonify({"error": "Session ID is required"}), 400
             
-        interview = interviews_collection.find_one({"_id": ObjectId(session_id)})
+        interview = interviews_collection.find_one({"_id": ObjectId(session_id)}, {"analysis": 1})
         if not interview:
             return jsonify({"error": "Interview not found"}), 404
             
@@ -469,31 +553,193 @@ def complete_interview():
         if not session_id:
             return jsonify({"error": "Session ID is required"}), 400
 
-        # Prepare update data
+        interview_id = ObjectId(session_id)
+        transcript = data.get("transcript", {})
+
+        # Answers are normally already on the session via /append-answer, so
+        # completion is just a status update; older clients still send everything
         update_data = {
             "status": "completed",
-            "completed_at": datetime.datetime.utcnow(),
-            "messages": data.get("messages", []),
-            "transcript": data.get("transcript", {})
+            "completed_at": datetime.datetime.utcnow()
         }
+        if "messages" in data:
+            update_data["messages"] = data["messages"]
+        if "transcript" in data:
+            update_data["transcript"] = compact_transcript(transcript)
 
         # Add analysis if provided
         if data.get("analysis"):
             update_data["analysis"] = data["analysis"]
 
         result = interviews_collection.update_one(
-            {"_id": ObjectId(session_id)},
+            {"_id": interview_id},
             {"$set": update_data}
         )
 
         if result.modified_count == 0:
             return jsonify({"error": "Interview not found"}), 404
 
+        if has_verbose_data(transcript):
+            store_raw_transcript(raw_transcripts_collection, interview_id, transcript)
+
+        # Count each interview towards its user's progress exactly once
+        interview = interviews_collection.find_one_and_update(
+            {
+                "_id": interview_id,
+                "user_email": {"$ne": None},
+                "analysis.scores": {"$exists": True},
+                "progress_recorded": {"$ne": True}
+            },
+            {"$set": {"progress_recorded": True}},
+            projection=PROGRESS_PROJECTION
+        )
+        if interview:
+            record_interview_progress(progress_collection, interview)
+
         return jsonify({"status": "success"})
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/append-answer', methods=['POST'])
+def append_answer():
+    """Append one answer to an in-progress session as soon as it is transcribed"""
+    try:
+        data = request.json
+        session_id = data.get("session_id")
+
+        if not session_id:
+            return jsonify({"error": "Session ID is required"}), 400
+
+        interview_id = ObjectId(session_id)
+        transcript = data.get("transcript", {})
+        position = data.get("position")
+        answer = compact_transcript(transcript)
+        answer.update({
+            "question": data.get("question"),
+            "skill": data.get("skill"),
+            "position": position,
+            "answered_at": datetime.datetime.utcnow()
+        })
+
+        # The question position makes retries idempotent: a second POST for
+        # the same question matches nothing instead of pushing a duplicate
+        query = {"_id": interview_id, "status": {"$ne": "completed"}}
+        if position is not None:
+            query["answers.position"] = {"$ne": position}
+
+        interview = interviews_collection.find_one_and_update(
+            query,
+            {
+                "$push": {"answers": answer},
+                "$inc": {"answer_count": 1},
+                "$set": {"updated_at": answer["answered_at"]}
+            },
+            projection={"answer_count": 1},
+            return_document=ReturnDocument.AFTER
+        )
+        if not interview:
+            if position is not None:
+                existing = interviews_collection.find_one(
+                    {"_id": interview_id, "answers.position": position},
+                    {"answers.position": 1}
+                )
+                if existing:
+                    positions = [a.get("position") for a in existing["answers"]]
+                    return jsonify({"status": "duplicate", "answer_index": positions.index(position)})
+            return jsonify({"error": "Active interview not found"}), 404
+
+        answer_index = interview["answer_count"] - 1
+        if has_verbose_data(transcript):
+            store_raw_transcript(raw_transcripts_collection, interview_id, transcript, key=f"answer-{answer_index}")
+
+        return jsonify({"status": "success", "answer_index": answer_index})
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+def serialize_answers(answers):
+    for answer in answers:
+        answer["answered_at"] = answer["answered_at"].isoformat() if answer.get("answered_at") else None
+    return answers
+
+@app.route('/session-answers', methods=['POST'])
+@compressed
+def session_answers():
+    """Answers recorded so far, so an interrupted session can be recovered"""
+    try:
+        data = request.json
+        session_id = data.get("session_id")
+
+        if not session_id:
+            return jsonify({"error": "Session ID is required"}), 400
+
+        interview = interviews_collection.find_one(
+            {"_id": ObjectId(session_id)},
+            {"skills": 1, "status": 1, "answers": 1, "question_cursor": 1, "question_total": 1}
+        )
+        if not interview:
+            return jsonify({"error": "Interview not found"}), 404
+
+        return jsonify({
+            "skills": interview.get("skills", []),
+            "status": interview.get("status"),
+            "answers": serialize_answers(interview.get("answers", [])),
+            "question_cursor": interview.get("question_cursor", 0),
+            "question_total": interview.get("question_total")
+        })
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/interview-transcript', methods=['POST'])
+@compressed
+def interview_transcript():
+    """Return the compact transcript and answers, plus the verbose Whisper data when asked for.
+
+    Sessions that record answers as they go have no final transcript; their
+    data is the answers array, with verbose data stored as answer-<n>.
+    """
+    try:
+        data = request.json
+        session_id = data.get("session_id")
+
+        if not session_id:
+            return jsonify({"error": "Session ID is required"}), 400
+
+        interview_id = ObjectId(session_id)
+        interview = interviews_collection.find_one({"_id": interview_id}, {"transcript": 1, "answers": 1})
+        if not interview:
+            return jsonify({"error": "Interview not found"}), 404
+
+        response = {
+            "transcript": interview.get("transcript", {}),
+            "answers": serialize_answers(interview.get("answers", []))
+        }
+        if data.get("verbose"):
+            response["raw_transcripts"] = load_raw_transcripts(raw_transcripts_collection, interview_id)
+
+        return jsonify(response)
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/user-progress', methods=['POST'])
+def user_progress():
+    data = request.json
+    user_email = data.get("email")
+    if not user_email:
+        return jsonify({"error": "Email is required"}), 400
+
+    try:
+        rollup = progress_collection.find_one({"user_email": user_email})
+        if not rollup:
+            return jsonify({"interview_count": 0, "average_scores": {}, "rolling_average_scores": {},
+                            "skills": [], "best_skills": [], "worst_skills": []})
+        return jsonify(summarize_progress(rollup))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 @app.route('/clear-session', methods=['POST'])
 def clear_session():
     data = request.json
@@ -1,16 +1,221 @@
 import os
+import time
+import hashlib
+import queue
 import tempfile
+import threading
+from bisect import bisect_left, bisect_right
+from concurrent.futures import Future
+import torch
 import whisper
 from pydub import AudioSegment
 from pydub.silence import detect_silence
 import logging
+from transcription_cache import transcription_cache
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Load Whisper model
-model = whisper.load_model("base")
+WHISPER_MODEL_NAME = os.getenv("WHISPER_MODEL", "base")
+model = whisper.load_model(WHISPER_MODEL_NAME)
+
+PAUSE_SILENCE_THRESH = -40
+PAUSE_MIN_SILENCE_LEN = 1000
+
+# Silences at least this long are cut out before ASR, leaving TRIM_KEEP_MS of
+# silence in their place (0 disables trimming)
+TRIM_SILENCE_MS = int(os.getenv("ASR_TRIM_SILENCE_MS", "2000"))
+TRIM_KEEP_MS = int(os.getenv("ASR_TRIM_KEEP_MS", "500"))
+
+# Bump when anything that changes transcription output changes, so cached
+# results from the old configuration are not reused
+ASR_CACHE_VERSION = (
+    f"whisper-{WHISPER_MODEL_NAME}:en:pauses{PAUSE_SILENCE_THRESH}/{PAUSE_MIN_SILENCE_LEN}"
+    f":trim{TRIM_SILENCE_MS}/{TRIM_KEEP_MS}:v2"
+)
+
+# Requests arriving within this window are decoded together (0 disables batching;
+# requests are then transcribed one at a time on the batcher thread)
+BATCH_WINDOW = float(os.getenv("TRANSCRIBE_BATCH_WINDOW_MS", "50")) / 1000
+MAX_BATCH_SIZE = int(os.getenv("TRANSCRIBE_MAX_BATCH_SIZE", "8"))
+
+# Same fallback thresholds model.transcribe uses to retry a window
+COMPRESSION_RATIO_THRESHOLD = 2.4
+LOGPROB_THRESHOLD = -1.0
+NO_SPEECH_THRESHOLD = 0.6
+# Seconds per Whisper timestamp token
+TIME_PRECISION = 2 * whisper.audio.HOP_LENGTH / whisper.audio.SAMPLE_RATE
+
+
+class TranscriptionBatcher:
+    """Collects concurrent transcription requests and decodes them as one batch.
+
+    Clips that fit in a single 30 second Whisper window are padded, stacked and
+    run through one encoder/decoder pass and split into timed segments exactly
+    as model.transcribe would. Longer clips, single requests and batch results
+    that fail Whisper's quality checks or need a second window use
+    model.transcribe, still on this thread.
+    """
+
+    def __init__(self, model, window=BATCH_WINDOW, max_batch_size=MAX_BATCH_SIZE):
+        self.model = model
+        self.window = window
+        self.max_batch_size = max(1, max_batch_size)
+        self.tokenizer = whisper.tokenizer.get_tokenizer(
+            model.is_multilingual, num_languages=model.num_languages, language="en", task="transcribe"
+        )
+        self._queue = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name="transcription-batcher", daemon=True)
+        self.thread.start()
+
+    def transcribe(self, wav_path):
+        future = Future()
+        self._queue.put((wav_path, future))
+        return future.result()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._process(batch)
+
+    def _process(self, batch):
+        short_items = []
+        for wav_path, future in batch:
+            try:
+                audio = whisper.load_audio(wav_path)
+            except Exception as e:
+                future.set_exception(e)
+                continue
+            if len(audio) <= whisper.audio.N_SAMPLES:
+                short_items.append((audio, future))
+            else:
+                self._transcribe_single(audio, future)
+
+        if len(short_items) == 1:
+            self._transcribe_single(*short_items[0])
+        elif short_items:
+            logger.debug("Decoding batch of %d clips", len(short_items))
+            try:
+                results = self._decode_batch([audio for audio, _ in short_items])
+            except Exception as e:
+                logger.error(f"Batched decoding failed, falling back to single runs: {e}")
+                results = [None] * len(short_items)
+
+            for (audio, future), result in zip(short_items, results):
+                if result is None:
+                    self._transcribe_single(audio, future)
+                else:
+                    future.set_result(result)
+
+    def _transcribe_single(self, audio, future):
+        try:
+            future.set_result(self.model.transcribe(audio, language="en"))
+        except Exception as e:
+            future.set_exception(e)
+
+    def _decode_batch(self, audios):
+        """Decode up-to-30s clips in one pass; None marks clips that need a retry.
+
+        Mirrors the first window of model.transcribe: same mel padding,
+        timestamp decoding and segment splitting. Clips where transcribe would
+        go on to decode a second window are returned as None.
+        """
+        mels, content_frames = [], []
+        for audio in audios:
+            mel = whisper.log_mel_spectrogram(audio, self.model.dims.n_mels, padding=whisper.audio.N_SAMPLES)
+            frames = mel.shape[-1] - whisper.audio.N_FRAMES
+            mels.append(whisper.pad_or_trim(mel[:, :frames], whisper.audio.N_FRAMES))
+            content_frames.append(frames)
+        options = whisper.DecodingOptions(
+            language="en",
+            fp16=self.model.device.type == "cuda"
+        )
+        decoded = whisper.decode(self.model, torch.stack(mels).to(self.model.device), options)
+
+        results = []
+        for frames, result in zip(content_frames, decoded):
+            silent = result.no_speech_prob > NO_SPEECH_THRESHOLD and result.avg_logprob <= LOGPROB_THRESHOLD
+            if silent:
+                results.append({"text": "", "segments": [], "language": "en"})
+            elif (result.compression_ratio > COMPRESSION_RATIO_THRESHOLD
+                    or result.avg_logprob < LOGPROB_THRESHOLD):
+                results.append(None)
+            else:
+                segments = self._split_segments(result, frames * whisper.audio.HOP_LENGTH / whisper.audio.SAMPLE_RATE)
+                if segments is None:
+                    results.append(None)
+                    continue
+                results.append({
+                    "text": self.tokenizer.decode([t for s in segments for t in s["tokens"]]),
+                    "segments": segments,
+                    "language": "en"
+                })
+        return results
+
+    def _split_segments(self, result, duration):
+        """Split a decoded window into timed segments the way model.transcribe does"""
+        tokenizer = self.tokenizer
+        tokens = result.tokens
+        is_timestamp = [t >= tokenizer.timestamp_begin for t in tokens]
+        single_timestamp_ending = is_timestamp[-2:] == [False, True]
+        slices = [i for i in range(1, len(tokens)) if is_timestamp[i - 1] and is_timestamp[i]]
+
+        spans = []
+        if slices:
+            if single_timestamp_ending:
+                slices.append(len(tokens))
+            elif (tokens[slices[-1] - 1] - tokenizer.timestamp_begin) * TIME_PRECISION < duration:
+                # transcribe would seek to the last timestamp and decode the rest again
+                return None
+            last = 0
+            for current in slices:
+                sliced = tokens[last:current]
+                spans.append((
+                    (sliced[0] - tokenizer.timestamp_begin) * TIME_PRECISION,
+                    (sliced[-1] - tokenizer.timestamp_begin) * TIME_PRECISION,
+                    sliced
+                ))
+                last = current
+        else:
+            timestamps = [t for t in tokens if t >= tokenizer.timestamp_begin]
+            if timestamps and timestamps[-1] != tokenizer.timestamp_begin:
+                duration = (timestamps[-1] - tokenizer.timestamp_begin) * TIME_PRECISION
+            spans.append((0.0, duration, tokens))
+
+        return [
+            {
+                "id": i,
+                "seek": 0,
+                "start": start,
+                "end": end,
+                "text": tokenizer.decode([t for t in sliced if t < tokenizer.eot]),
+                "tokens": list(sliced),
+                "temperature": result.temperature,
+                "avg_logprob": result.avg_logprob,
+                "compression_ratio": result.compression_ratio,
+                "no_speech_prob": result.no_speech_prob
+            }
+            for i, (start, end, sliced) in enumerate(spans)
+        ]
+
+
+# Always route ASR through the batcher thread: the shared model is not safe
+# to decode from several request threads at once
+batcher = TranscriptionBatcher(model)
+
+
+def run_asr(wav_path):
+    """Transcribe a WAV file on the batcher thread"""
+    return batcher.transcribe(wav_path)
 
 def convert_to_wav(input_path, output_path):
     """Convert any audio file to WAV format using pydub"""
@@ -27,32 +232,101 @@ def convert_to_wav(input_path, output_path):
         logger.error(f"Error converting audio to WAV: {e}")
         return False
 
-def detect_pauses(audio_path, silence_thresh=-40, min_silence_len=1000):
+def find_silences(audio, silence_thresh=PAUSE_SILENCE_THRESH, min_silence_len=PAUSE_MIN_SILENCE_LEN):
+    """Silent [start, end] ranges of a loaded AudioSegment, in milliseconds"""
+    return detect_silence(
+        audio, 
+        min_silence_len=min_silence_len, 
+        silence_thresh=silence_thresh
+    )
+
+def silences_to_pauses(silences):
+    return [{"start": round(start / 1000, 2), "end": round(end / 1000, 2)} 
+            for start, end in silences]
+
+def detect_pauses(audio_path, silence_thresh=PAUSE_SILENCE_THRESH, min_silence_len=PAUSE_MIN_SILENCE_LEN):
     """Detect pauses in audio file"""
     try:
         audio = AudioSegment.from_file(audio_path)
-        silences = detect_silence(
-            audio, 
-            min_silence_len=min_silence_len, 
-            silence_thresh=silence_thresh
-        )
-        pauses = [{"start": round(start / 1000, 2), "end": round(end / 1000, 2)} 
-                 for start, end in silences]
-        return pauses
+        return silences_to_pauses(find_silences(audio, silence_thresh, min_silence_len))
     except Exception as e:
         logger.error(f"Error detecting pauses: {e}")
         return []
 
+class TimestampMap:
+    """Maps times in silence-trimmed audio back to the original recording"""
+
+    def __init__(self, pieces):
+        # pieces: (trimmed_start_ms, original_start_ms, length_ms), in order
+        self.pieces = pieces
+        self.trimmed_starts = [piece[0] for piece in pieces]
+
+    def to_original(self, seconds, is_end=False):
+        ms = seconds * 1000
+        # A segment ending exactly at a cut belongs to the piece before it
+        if is_end:
+            index = bisect_left(self.trimmed_starts, ms) - 1
+        else:
+            index = bisect_right(self.trimmed_starts, ms) - 1
+        trimmed_start, original_start, length = self.pieces[max(0, index)]
+        return round((original_start + min(max(ms - trimmed_start, 0), length)) / 1000, 2)
+
+    def remap_segments(self, segments):
+        remapped = []
+        for segment in segments:
+            segment = dict(segment)
+            segment["start"] = self.to_original(segment["start"])
+            segment["end"] = self.to_original(segment["end"], is_end=True)
+            if segment.get("words"):
+                segment["words"] = [
+                    dict(word, start=self.to_original(word["start"]), end=self.to_original(word["end"], is_end=True))
+                    for word in segment["words"]
+                ]
+            remapped.append(segment)
+        return remapped
+
+def trim_long_silences(audio, silences, min_cut_ms=TRIM_SILENCE_MS, keep_ms=TRIM_KEEP_MS):
+    """Cut long silences out of audio.
+
+    Returns the trimmed AudioSegment and its TimestampMap, or (None, None) when
+    nothing is long enough to cut.
+    """
+    cuts = [(start + keep_ms // 2, end - keep_ms // 2)
+            for start, end in silences if end - start >= max(min_cut_ms, keep_ms + 1)]
+    if min_cut_ms <= 0 or not cuts:
+        return None, None
+
+    pieces = []
+    trimmed = AudioSegment.empty()
+    position = 0
+    for cut_start, cut_end in cuts + [(len(audio), len(audio))]:
+        if cut_start > position:
+            pieces.append((len(trimmed), position, cut_start - position))
+            trimmed += audio[position:cut_start]
+        position = cut_end
+
+    return trimmed, TimestampMap(pieces)
+
 def transcribe_audio_file(audio_file, file_extension=".webm"):
     """Transcribe audio file and detect pauses"""
     temp_audio_path = None
     wav_path = None
+    trimmed_path = None
     
     try:
-        # Save uploaded audio to temp file
+        # Save uploaded audio to temp file, hashing it on the way
+        digest = hashlib.sha256()
         with tempfile.NamedTemporaryFile(delete=False, suffix=file_extension) as temp_audio:
             temp_audio_path = temp_audio.name
-            audio_file.save(temp_audio_path)
+            for chunk in iter(lambda: audio_file.stream.read(64 * 1024), b""):
+                digest.update(chunk)
+                temp_audio.write(chunk)
+
+        cache_key = f"{digest.hexdigest()}:{ASR_CACHE_VERSION}"
+        cached = transcription_cache.get(cache_key)
+        if cached is not None:
+            logger.debug("Transcription cache hit for %s", cache_key)
+            return cached
 
         # Create WAV file path
         wav_path = temp_audio_path.replace(file_extension, ".wav")
@@ -66,18 +340,31 @@ def transcribe_audio_file(audio_file, file_extension=".webm"):
                 "text": ""
             }
 
-        # Transcribe with Whisper
-        result = model.transcribe(wav_path, language="en")
+        # Detect pauses on the original recording
+        audio = AudioSegment.from_file(wav_path)
+        silences = find_silences(audio)
+        pauses = silences_to_pauses(silences)
 
+        # Skip long silences so Whisper only spends time on speech
+        trimmed, timestamp_map = trim_long_silences(audio, silences)
+        if trimmed is not None:
+            trimmed_path = wav_path.replace(".wav", ".trimmed.wav")
+            trimmed.export(trimmed_path, format="wav", codec="pcm_s16le")
+            logger.debug("Trimmed audio from %d ms to %d ms", len(audio), len(trimmed))
 
-        # Detect pauses
-        pauses = detect_pauses(wav_path)
+        # Transcribe with Whisper
+        result = run_asr(trimmed_path or wav_path)
+        segments = result.get("segments", [])
+        if timestamp_map is not None:
+            segments = timestamp_map.remap_segments(segments)
 
-        return {
-            "segments": result.get("segments", []),
+        transcription = {
+            "segments": segments,
             "text": result.get("text", ""),
             "pauses": pauses
         }
+        transcription_cache.put(cache_key, transcription)
+        return transcription
 
     except Exception as e:
         logger.error(f"Error during transcription: {e}")
@@ -90,7 +377,7 @@ def transcribe_audio_file(audio_file, file_extension=".webm"):
 
     finally:
         # Clean up temp files
-        for path in [temp_audio_path, wav_path]:
+        for path in [temp_audio_path, wav_path, trimmed_path]:
             if path and os.path.exists(path):
                 try:
                     os.remove(path)
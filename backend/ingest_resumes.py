@@ -0,0 +1,157 @@
+# ingest_resumes.py
+"""Pre-build interview sessions from a folder or archive of resume PDFs.
+
+    python ingest_resumes.py resumes/ --workers 8 --report report.jsonl
+    python ingest_resumes.py batch.zip --email recruiter@example.com
+
+Each PDF goes through the same extraction and skill pipeline as
+/upload-resume, spread over a process pool with the spaCy model loaded once
+per worker. Sessions are inserted into Mongo in bulk batches and a JSONL
+report line (file, skills, session_id or error) is written per resume.
+"""
+import os
+import sys
+import json
+import time
+import tarfile
+import zipfile
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import nltk
+from dotenv import load_dotenv
+from pymongo import MongoClient
+from pymongo.errors import BulkWriteError
+from question_bank import new_question_seed, plan_skills, new_session
+from resume_processor import get_nlp, get_stop_words, process_resume, process_resume_bytes
+
+
+def init_worker():
+    """Load the NLP models once per worker process"""
+    get_stop_words()
+    get_nlp()
+
+
+def extract_resume_skills(item):
+    """Worker: (name, path, data) -> report row with the skills found"""
+    name, path, data = item
+    try:
+        skills = process_resume(path) if path else process_resume_bytes(data)
+        return {"file": name, "skills": sorted(skills)}
+    except Exception as e:
+        return {"file": name, "skills": [], "error": str(e)}
+
+
+def iter_resumes(source):
+    """Yield (name, path, data) for every PDF in a directory or archive.
+
+    Directory entries are read by the workers; archive members are read here
+    so workers don't need to reopen the archive.
+    """
+    if os.path.isdir(source):
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            for filename in sorted(files):
+                if filename.lower().endswith(".pdf"):
+                    path = os.path.join(root, filename)
+                    yield os.path.relpath(path, source), path, None
+    elif zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and info.filename.lower().endswith(".pdf"):
+                    yield info.filename, None, archive.read(info)
+    elif tarfile.is_tarfile(source):
+        with tarfile.open(source) as archive:
+            for member in archive:
+                if member.isfile() and member.name.lower().endswith(".pdf"):
+                    yield member.name, None, archive.extractfile(member).read()
+    else:
+        raise ValueError(f"{source} is not a directory, zip or tar archive")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", help="directory, .zip or .tar(.gz) of resume PDFs")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="size of the process pool")
+    parser.add_argument("--batch-size", type=int, default=200, help="sessions per bulk insert")
+    parser.add_argument("--report", default="ingest_report.jsonl", help="JSONL report path")
+    parser.add_argument("--email", help="user email to attach the sessions to")
+    parser.add_argument("--dry-run", action="store_true", help="extract skills without writing sessions")
+    args = parser.parse_args()
+
+    load_dotenv()
+    nltk.download('stopwords', quiet=True)
+    interviews = None if args.dry_run else MongoClient(os.getenv("MONGO_URI")).mock_interviews.interviews
+
+    started = time.perf_counter()
+    counts = {"resumes": 0, "sessions": 0, "failed": 0}
+    pending_rows, pending_sessions = [], []
+
+    def flush(report):
+        """Bulk insert buffered sessions, then write their report rows.
+
+        The insert is unordered, so one bad document only fails its own row;
+        the report is written either way.
+        """
+        if pending_sessions:
+            errors = {}
+            try:
+                interviews.insert_many([session for _, session in pending_sessions], ordered=False)
+            except BulkWriteError as e:
+                errors = {error["index"]: error.get("errmsg", "Insert failed") for error in e.details["writeErrors"]}
+            # insert_many assigns _id on each session before sending it
+            for index, (row, session) in enumerate(pending_sessions):
+                if index in errors:
+                    row["error"] = errors[index]
+                    counts["failed"] += 1
+                else:
+                    row["session_id"] = str(session["_id"])
+                    counts["sessions"] += 1
+        for row in pending_rows:
+            report.write(json.dumps(row) + "\n")
+        pending_rows.clear()
+        pending_sessions.clear()
+
+    def handle(row, report):
+        counts["resumes"] += 1
+        pending_rows.append(row)
+        if row.get("error") is None and row["skills"]:
+            seed = new_question_seed()
+            planned_skills = plan_skills(row["skills"], seed)
+            if planned_skills and interviews is not None:
+                session = new_session(planned_skills, seed, args.email)
+                session.update({"source": "bulk_ingest", "source_file": row["file"]})
+                pending_sessions.append((row, session))
+            elif not planned_skills:
+                row["error"] = "No questions available for any of the skills"
+        elif row.get("error") is None:
+            row["error"] = "No skills found in resume"
+        if row.get("error"):
+            counts["failed"] += 1
+
+        if len(pending_rows) >= args.batch_size:
+            flush(report)
+            rate = counts["resumes"] / max(time.perf_counter() - started, 1e-9)
+            print(f"\r{counts['resumes']} resumes, {counts['sessions']} sessions ({rate:.1f} resumes/s)",
+                  end="", file=sys.stderr, flush=True)
+
+    # Bounded number of resumes in flight so large archives are not read into memory at once
+    with open(args.report, "w") as report, \
+            ProcessPoolExecutor(max_workers=args.workers, initializer=init_worker) as pool:
+        in_flight = deque()
+        for item in iter_resumes(args.source):
+            in_flight.append(pool.submit(extract_resume_skills, item))
+            if len(in_flight) >= args.workers * 4:
+                handle(in_flight.popleft().result(), report)
+        while in_flight:
+            handle(in_flight.popleft().result(), report)
+        flush(report)
+
+    elapsed = time.perf_counter() - started
+    print(f"\nProcessed {counts['resumes']} resumes in {elapsed:.1f}s "
+          f"({counts['resumes'] / max(elapsed, 1e-9):.1f} resumes/s): "
+          f"{counts['sessions']} sessions created, {counts['failed']} failed. Report: {args.report}")
+
+
+if __name__ == "__main__":
+    main()
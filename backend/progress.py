@@ -0,0 +1,188 @@
+# progress.py
+import datetime
+
+ROLLUP_SCORES = ("overall_score", "grammar_score", "stop_word_score", "filler_score", "tone_score")
+# Number of most recent interviews kept for the rolling averages
+RECENT_WINDOW = 10
+
+
+def skill_key(skill):
+    """Skill names such as node.js can't be used as-is in Mongo field paths"""
+    return skill.replace(".", "_").replace("$", "_")
+
+
+# Interview fields the rollup is built from
+PROGRESS_PROJECTION = {
+    "user_email": 1,
+    "skills": 1,
+    "completed_at": 1,
+    "analysis.scores": 1,
+    "analysis.relevance_analysis.answers": 1,
+    "analysis.tone_analysis.answers.polarity": 1
+}
+
+
+def interview_rollup_changes(interview):
+    """The $inc, $push and $set fields that fold one interview into a rollup"""
+    analysis = interview["analysis"]
+    scores = analysis["scores"]
+
+    increments = {"interview_count": 1}
+    pushes = {}
+    updates = {}
+    for name in ROLLUP_SCORES:
+        value = float(scores.get(name, 0))
+        increments[f"totals.{name}"] = value
+        pushes[f"recent.{name}"] = value
+
+    # Per-answer signals grouped by the skill each answer was for. Tone rows
+    # are per answer in the same order as the relevance answers.
+    answers = analysis.get("relevance_analysis", {}).get("answers", [])
+    tones = analysis.get("tone_analysis", {}).get("answers", [])
+    if len(tones) != len(answers):
+        tones = [None] * len(answers)
+    relevance, polarity = {}, {}
+    for answer, tone in zip(answers, tones):
+        if answer.get("skill"):
+            relevance.setdefault(answer["skill"], []).append(answer.get("relevance", 0))
+            if tone is not None:
+                polarity.setdefault(answer["skill"], []).append(tone.get("polarity", 0))
+
+    overall = float(scores.get("overall_score", 0))
+    for skill in interview.get("skills", []):
+        key = skill_key(skill)
+        increments[f"skills.{key}.count"] = 1
+        increments[f"skills.{key}.total_score"] = overall
+        updates[f"skills.{key}.name"] = skill
+        if skill in relevance:
+            increments[f"skills.{key}.relevance_count"] = len(relevance[skill])
+            increments[f"skills.{key}.total_relevance"] = sum(relevance[skill])
+        if skill in polarity:
+            increments[f"skills.{key}.polarity_count"] = len(polarity[skill])
+            increments[f"skills.{key}.total_polarity"] = sum(polarity[skill])
+
+    return increments, pushes, updates
+
+
+def record_interview_progress(progress_collection, interview):
+    """Fold one completed interview into its user's rollup document.
+
+    Uses only $inc/$push/$set, so concurrent completions for the same user
+    never overwrite each other.
+    """
+    now = datetime.datetime.utcnow()
+    increments, pushes, updates = interview_rollup_changes(interview)
+    updates["updated_at"] = now
+
+    progress_collection.update_one(
+        {"user_email": interview["user_email"]},
+        {
+            "$inc": increments,
+            "$push": {
+                path: {"$each": [value], "$slice": -RECENT_WINDOW} for path, value in pushes.items()
+            },
+            "$set": updates,
+            "$setOnInsert": {"created_at": now}
+        },
+        upsert=True
+    )
+
+
+def rebuild_user_progress(progress_collection, interviews_collection, user_email):
+    """Recompute a user's rollup from all their recorded interviews.
+
+    Used after stored scores change (e.g. by rescore_interviews.py). The
+    rollup is replaced wholesale, so a completion recorded while this runs
+    can be lost; run it outside busy periods.
+    """
+    rollup = {}
+
+    def field(path):
+        parent = rollup
+        *parents, name = path.split(".")
+        for part in parents:
+            parent = parent.setdefault(part, {})
+        return parent, name
+
+    cursor = interviews_collection.find(
+        {"user_email": user_email, "progress_recorded": True, "analysis.scores": {"$exists": True}},
+        PROGRESS_PROJECTION
+    ).sort([("completed_at", 1), ("_id", 1)])
+    for interview in cursor:
+        increments, pushes, updates = interview_rollup_changes(interview)
+        for path, value in increments.items():
+            parent, name = field(path)
+            parent[name] = parent.get(name, 0) + value
+        for path, value in pushes.items():
+            parent, name = field(path)
+            parent[name] = (parent.get(name, []) + [value])[-RECENT_WINDOW:]
+        for path, value in updates.items():
+            parent, name = field(path)
+            parent[name] = value
+
+    now = datetime.datetime.utcnow()
+    progress_collection.update_one(
+        {"user_email": user_email},
+        {
+            "$set": {
+                "interview_count": rollup.get("interview_count", 0),
+                "totals": rollup.get("totals", {}),
+                "recent": rollup.get("recent", {}),
+                "skills": rollup.get("skills", {}),
+                "updated_at": now
+            },
+            "$setOnInsert": {"created_at": now}
+        },
+        upsert=True
+    )
+
+
+def summarize_progress(rollup, top_n=3):
+    """Turn a rollup document into averages and best/worst skills"""
+    count = rollup.get("interview_count", 0)
+    totals = rollup.get("totals", {})
+    recent = rollup.get("recent", {})
+
+    skills = []
+    for entry in rollup.get("skills", {}).values():
+        skills.append({
+            "skill": entry.get("name"),
+            "interviews": entry.get("count", 0),
+            # Overall score of the interviews that covered the skill, for context only
+            "average_score": round(entry.get("total_score", 0) / max(1, entry.get("count", 0)), 2),
+            "average_relevance": (
+                round(entry["total_relevance"] / entry["relevance_count"], 4)
+                if entry.get("relevance_count") else None
+            ),
+            "average_polarity": (
+                round(entry["total_polarity"] / entry["polarity_count"], 4)
+                if entry.get("polarity_count") else None
+            )
+        })
+
+    # Rank by per-answer signals only: the interview score is shared by every
+    # skill in the interview, so it cannot tell them apart
+    ranked = sorted(
+        (s for s in skills if s["average_relevance"] is not None),
+        key=lambda s: (s["average_relevance"], s["average_polarity"] or 0),
+        reverse=True
+    )
+    skills = ranked + [s for s in skills if s["average_relevance"] is None]
+    # Best and worst never overlap; with few ranked skills the best side gets the odd one
+    best_count = min(top_n, (len(ranked) + 1) // 2)
+    worst_count = min(top_n, len(ranked) - best_count)
+
+    return {
+        "interview_count": count,
+        "average_scores": {
+            name: round(totals.get(name, 0) / max(1, count), 2) for name in ROLLUP_SCORES
+        },
+        "rolling_average_scores": {
+            name: round(sum(recent.get(name, [])) / max(1, len(recent.get(name, []))), 2)
+            for name in ROLLUP_SCORES
+        },
+        "skills": skills,
+        "best_skills": ranked[:best_count],
+        "worst_skills": list(reversed(ranked[len(ranked) - worst_count:])),
+        "updated_at": rollup.get("updated_at")
+    }
@@ -0,0 +1,124 @@
+# question_bank.py
+import os
+import re
+import random
+import datetime
+import threading
+from functools import lru_cache
+import openpyxl
+
+QUESTIONS_FILE = 'qstns.xlsx'
+
+_question_bank = None
+_question_bank_lock = threading.Lock()
+
+def load_questions_from_excel(file_path=QUESTIONS_FILE):
+    """Load questions from Excel file with proper error handling"""
+    qdict = {}
+    try:
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"Excel file not found at {os.path.abspath(file_path)}")
+            
+        wb = openpyxl.load_workbook(file_path)
+        sheet = wb.active
+        
+        for i, row in enumerate(sheet.iter_rows(min_row=2, values_only=True), start=2):
+            skill = str(row[0]).lower().strip() if row[0] else None
+            question = str(row[1]).strip() if row[1] else None
+            
+            # Remove numbers and dots/colons at the start of questions
+            if question:
+                # This regex removes leading numbers followed by punctuation and spaces
+                question = re.sub(r'^\d+[.:]\s*', '', question).strip()
+            
+            if skill and question:
+                if skill not in qdict:
+                    qdict[skill] = []
+                qdict[skill].append(question)
+        
+        if not qdict:
+            raise ValueError("Excel file contains no valid questions")
+            
+        return qdict
+    except Exception as e:
+        raise ValueError(f"Could not load questions: {str(e)}")
+
+def get_question_bank():
+    """Return the question bank, loading it from Excel on first use"""
+    global _question_bank
+    if _question_bank is None:
+        with _question_bank_lock:
+            if _question_bank is None:
+                _question_bank = load_questions_from_excel()
+    return _question_bank
+
+
+def new_question_seed():
+    return random.getrandbits(32)
+
+
+def plan_skills(skills, seed):
+    """Skills that have questions, in the session's shuffled order"""
+    bank = get_question_bank()
+    available = sorted({skill for skill in skills if skill.lower() in bank})
+    rng = random.Random(seed)
+    return rng.sample(available, len(available))
+
+
+@lru_cache(maxsize=1024)
+def _question_plan(skills, seed):
+    """(skill, question order) pairs for a session, derived only from its seed"""
+    bank = get_question_bank()
+    rng = random.Random(seed)
+    plan = []
+    for skill in skills:
+        count = len(bank[skill.lower()])
+        plan.append((skill, rng.sample(range(count), count)))
+    return tuple(plan)
+
+
+def question_plan_size(skills):
+    bank = get_question_bank()
+    return sum(len(bank.get(skill.lower(), [])) for skill in skills)
+
+
+def question_at(skills, seed, position):
+    """Return the question at a flat position in the session's plan, or None past the end"""
+    bank = get_question_bank()
+    for skill_index, (skill, order) in enumerate(_question_plan(tuple(skills), seed)):
+        if position < len(order):
+            return {
+                "skill": skill,
+                "question": bank[skill.lower()][order[position]],
+                "skill_index": skill_index,
+                "question_index": position,
+                "skill_question_count": len(order)
+            }
+        position -= len(order)
+    return None
+
+
+def questions_for_plan(skills, seed):
+    """Materialize the whole plan as {skill: [questions]} for bulk consumers"""
+    bank = get_question_bank()
+    return {
+        skill: [bank[skill.lower()][i] for i in order]
+        for skill, order in _question_plan(tuple(skills), seed)
+    }
+
+
+def new_session(skills, seed, user_email=None):
+    """Interview session document for planned skills.
+
+    Only the plan is stored; questions are generated from the seed on demand.
+    """
+    return {
+        "user_email": user_email,
+        "skills": skills,
+        "question_seed": seed,
+        "question_cursor": 0,
+        "question_total": question_plan_size(skills),
+        "status": "started",
+        "transcript": [],
+        "created_at": datetime.datetime.utcnow()
+    }
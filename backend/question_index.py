@@ -0,0 +1,82 @@
+# question_index.py
+import threading
+import logging
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from question_bank import get_question_bank
+
+logger = logging.getLogger(__name__)
+
+_question_index = None
+_question_index_lock = threading.Lock()
+
+
+class QuestionIndex:
+    """Sparse TF-IDF index over the question bank, used to score answer relevance"""
+
+    def __init__(self, question_bank):
+        self.questions = []
+        self.skills = []
+        for skill, questions in question_bank.items():
+            for question in questions:
+                self.questions.append(question)
+                self.skills.append(skill)
+
+        self.vectorizer = TfidfVectorizer(stop_words="english", sublinear_tf=True, ngram_range=(1, 2))
+        # Rows are L2-normalised, so dot products are cosine similarities
+        self.matrix = self.vectorizer.fit_transform(self.questions)
+        logger.info("Built question index: %d questions, %d terms", *self.matrix.shape)
+
+    def score_answers(self, answers, top_k=3):
+        """Score each {"question", "answer"} pair against its question.
+
+        All answers are vectorised together; relevance is the cosine similarity
+        with the asked question, and related questions come from one sparse
+        product of the answers against the whole bank.
+        """
+        if not answers:
+            return {"answers": [], "average_relevance": 0}
+
+        answer_texts = [a.get("answer") or "" for a in answers]
+        question_texts = [a.get("question") or "" for a in answers]
+
+        answer_matrix = self.vectorizer.transform(answer_texts)
+        question_matrix = self.vectorizer.transform(question_texts)
+
+        relevance = np.asarray(answer_matrix.multiply(question_matrix).sum(axis=1)).ravel()
+        similarities = (answer_matrix @ self.matrix.T).toarray()
+
+        k = min(top_k, similarities.shape[1])
+        top = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+
+        scored = []
+        for row, answer in enumerate(answers):
+            ranked = sorted(top[row], key=lambda i: similarities[row, i], reverse=True)
+            scored.append({
+                "question": question_texts[row],
+                "skill": answer.get("skill"),
+                "relevance": round(float(relevance[row]), 4),
+                "related_questions": [
+                    {
+                        "question": self.questions[i],
+                        "skill": self.skills[i],
+                        "score": round(float(similarities[row, i]), 4)
+                    }
+                    for i in ranked if similarities[row, i] > 0
+                ]
+            })
+
+        return {
+            "answers": scored,
+            "average_relevance": round(float(relevance.mean()), 4)
+        }
+
+
+def get_question_index():
+    """Return the shared question index, building it on first use"""
+    global _question_index
+    if _question_index is None:
+        with _question_index_lock:
+            if _question_index is None:
+                _question_index = QuestionIndex(get_question_bank())
+    return _question_index
@@ -0,0 +1,182 @@
+# request_profiler.py
+import os
+import sys
+import hmac
+import time
+import uuid
+import random
+import cProfile
+import threading
+import logging
+from collections import Counter
+from functools import wraps
+from flask import request, g
+
+logger = logging.getLogger(__name__)
+
+# Profiling is off unless an admin token is configured or a sample rate is set
+PROFILE_ADMIN_TOKEN = os.getenv("PROFILE_ADMIN_TOKEN", "")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles"))
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL_MS", "5")) / 1000
+# Oldest profiles are pruned once either limit is exceeded (0 disables that limit)
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "200"))
+PROFILE_MAX_AGE = float(os.getenv("PROFILE_MAX_AGE_HOURS", "72")) * 3600
+
+PROFILE_MODES = {"sampling", "deterministic"}
+
+# endpoint -> threads doing that endpoint's work outside the request thread
+_helper_threads = {}
+
+
+def profile_helper_thread(endpoint, thread):
+    """Sample thread alongside the request thread when endpoint is profiled.
+
+    Its stacks are rooted at a [thread name] frame, so work handed off to a
+    background worker (e.g. the transcription batcher) stays in the profile.
+    cProfile cannot follow that work, so such endpoints are always sampled.
+    """
+    _helper_threads.setdefault(endpoint, []).append(thread)
+
+
+class StackSampler:
+    """Periodically samples thread stacks and counts folded stacks.
+
+    The output is the collapsed-stack format read by flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, thread_id, interval=PROFILE_INTERVAL, helper_threads=()):
+        self.thread_id = thread_id
+        # Helper threads get their name as the root frame; the request thread gets none
+        self.roots = {thread.ident: f"[{thread.name}]" for thread in helper_threads if thread.ident}
+        self.roots[thread_id] = None
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            for thread_id, root in self.roots.items():
+                frame = frames.get(thread_id)
+                if frame is None:
+                    continue
+                names = []
+                while frame is not None:
+                    code = frame.f_code
+                    names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                if root:
+                    names.append(root)
+                self.stacks[";".join(reversed(names))] += 1
+
+    def dump(self, path):
+        with open(path, "w") as f:
+            for stack, count in self.stacks.items():
+                f.write(f"{stack} {count}\n")
+
+
+def requested_profile_mode():
+    """Return the profiling mode for the current request, or None when disabled"""
+    if is_profile_admin():
+        mode = request.headers.get("X-Profile-Mode", "sampling").lower()
+        return mode if mode in PROFILE_MODES else "sampling"
+    if PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE:
+        return "sampling"
+    return None
+
+
+def profiled(view):
+    """Profile the wrapped route when requested by an admin or picked by sampling"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        mode = requested_profile_mode()
+        if mode is None:
+            return view(*args, **kwargs)
+
+        helper_threads = _helper_threads.get(request.endpoint, ())
+        if mode == "deterministic" and helper_threads:
+            # cProfile only traces the request thread, which just waits on the
+            # helpers, so sample them all instead
+            logger.info("Profiling %s with sampling: its work runs on helper threads", request.endpoint)
+            mode = "sampling"
+
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        profile_id = f"{request.endpoint}-{int(time.time())}-{uuid.uuid4().hex[:8]}"
+        started = time.perf_counter()
+
+        if mode == "deterministic":
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                response = view(*args, **kwargs)
+            finally:
+                profiler.disable()
+                filename = f"{profile_id}.prof"
+                profiler.dump_stats(os.path.join(PROFILE_DIR, filename))
+        else:
+            sampler = StackSampler(threading.get_ident(), helper_threads=helper_threads)
+            sampler.start()
+            try:
+                response = view(*args, **kwargs)
+            finally:
+                sampler.stop()
+                filename = f"{profile_id}.folded"
+                sampler.dump(os.path.join(PROFILE_DIR, filename))
+
+        logger.info("Stored %s profile %s (%.1f ms)", mode, filename,
+                    (time.perf_counter() - started) * 1000)
+        prune_profiles()
+        g.profile_artifact = filename
+        g.profile_mode = mode
+        return response
+    return wrapper
+
+
+def prune_profiles(directory=PROFILE_DIR, max_files=PROFILE_MAX_FILES, max_age=PROFILE_MAX_AGE):
+    """Delete profiles older than max_age seconds, then the oldest beyond max_files"""
+    try:
+        entries = sorted(
+            (entry for entry in os.scandir(directory)
+             if entry.is_file() and entry.name.endswith((".prof", ".folded"))),
+            key=lambda entry: entry.stat().st_mtime,
+            reverse=True
+        )
+    except OSError as e:
+        logger.warning("Could not list profiles in %s: %s", directory, e)
+        return
+
+    now = time.time()
+    for index, entry in enumerate(entries):
+        expired = max_age > 0 and now - entry.stat().st_mtime > max_age
+        if expired or (max_files > 0 and index >= max_files):
+            try:
+                os.remove(entry.path)
+            except OSError as e:
+                logger.warning("Could not remove profile %s: %s", entry.name, e)
+
+
+def attach_profile_header(response):
+    """after_request hook exposing the stored profile name and mode to the caller"""
+    filename = g.pop("profile_artifact", None)
+    mode = g.pop("profile_mode", None)
+    if filename:
+        response.headers["X-Profile-Id"] = filename
+        response.headers["X-Profile-Mode"] = mode
+    return response
+
+
+def is_profile_admin():
+    token = request.headers.get("X-Profile-Token", "")
+    # compare_digest only accepts ASCII str, so compare bytes to allow any header value
+    return bool(PROFILE_ADMIN_TOKEN) and hmac.compare_digest(
+        token.encode("utf-8", "surrogateescape"), PROFILE_ADMIN_TOKEN.encode("utf-8")
+    )
@@ -0,0 +1,153 @@
+# rescore_interviews.py
+"""Recompute scores and suggestions for stored interviews from their metrics.
+
+Run after changing weights or thresholds in scoring.py:
+
+    python rescore_interviews.py --workers 8 --batch-size 1000
+
+Progress is checkpointed after every bulk write, so an interrupted run picks
+up where it stopped. Use --restart to ignore the checkpoint. The progress
+rollups of users whose interviews were re-scored are rebuilt at the end.
+"""
+import os
+import json
+import time
+import argparse
+import datetime
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from bson import ObjectId
+from dotenv import load_dotenv
+from pymongo import MongoClient, UpdateOne
+from scoring import rescore_analysis
+from progress import rebuild_user_progress
+
+# Only the fields re-scoring reads; the tone timeline and the like stay on the server
+PROJECTION = {
+    "user_email": 1,
+    "progress_recorded": 1,
+    "analysis.short_response": 1,
+    "analysis.raw_metrics": 1,
+    "analysis.improvement_suggestions": 1,
+    "analysis.grammar_analysis": 1,
+    "analysis.stop_word_analysis": 1,
+    "analysis.filler_word_analysis": 1,
+    "analysis.tone_analysis.sentiment_score": 1,
+    "analysis.tone_analysis.subjectivity_score": 1,
+    "analysis.tone_analysis.formality_score": 1,
+}
+
+
+def rescore_batch(docs):
+    """Worker: turn a batch of (id, analysis, rollup user) into (id, $set fields, rollup user) updates"""
+    now = datetime.datetime.utcnow()
+    updates = []
+    for doc_id, analysis, user_email in docs:
+        result = rescore_analysis(analysis)
+        if result is None:
+            continue
+        updates.append((doc_id, {
+            "analysis.scores": result["scores"],
+            "analysis.improvement_suggestions": result["improvement_suggestions"],
+            "analysis.tone_analysis.tone_categories": result["tone_categories"],
+            "analysis.raw_metrics": result["raw_metrics"],
+            "analysis.scoring_version": result["scoring_version"],
+            "analysis.rescored_at": now
+        }, user_email))
+    return updates
+
+
+def load_checkpoint(path):
+    if not os.path.exists(path):
+        return None, 0, set()
+    with open(path) as f:
+        checkpoint = json.load(f)
+    return ObjectId(checkpoint["last_id"]), checkpoint.get("processed", 0), set(checkpoint.get("stale_users", []))
+
+
+def save_checkpoint(path, last_id, processed, stale_users):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"last_id": str(last_id), "processed": processed, "stale_users": sorted(stale_users)}, f)
+    os.replace(tmp_path, path)
+
+
+def iter_batches(cursor, batch_size):
+    batch = []
+    for doc in cursor:
+        # Only interviews already counted in a rollup make it stale
+        user_email = doc.get("user_email") if doc.get("progress_recorded") else None
+        batch.append((doc["_id"], doc["analysis"], user_email))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=1000, help="documents per worker batch and bulk write")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="size of the process pool")
+    parser.add_argument("--checkpoint", default="rescore.checkpoint.json", help="file recording the last written _id")
+    parser.add_argument("--restart", action="store_true", help="ignore an existing checkpoint")
+    parser.add_argument("--dry-run", action="store_true", help="compute scores without writing them")
+    args = parser.parse_args()
+
+    load_dotenv()
+    db = MongoClient(os.getenv("MONGO_URI")).mock_interviews
+    interviews = db.interviews
+
+    # Users whose rollups are stale are kept in the checkpoint until rebuilt
+    last_id, processed, stale_users = (None, 0, set()) if args.restart else load_checkpoint(args.checkpoint)
+    query = {"analysis": {"$exists": True}}
+    if last_id is not None:
+        query["_id"] = {"$gt": last_id}
+        print(f"Resuming after {last_id} ({processed} already processed)")
+
+    cursor = interviews.find(query, PROJECTION).sort("_id", 1).batch_size(args.batch_size)
+    started = time.perf_counter()
+    resumed_from = processed
+    updated = 0
+
+    def flush(batch_last_id, batch_size, updates):
+        nonlocal last_id, processed, updated
+        if updates and not args.dry_run:
+            interviews.bulk_write(
+                [UpdateOne({"_id": doc_id}, {"$set": fields}) for doc_id, fields, _ in updates],
+                ordered=False
+            )
+            stale_users.update(user_email for _, _, user_email in updates if user_email)
+        last_id = batch_last_id
+        processed += batch_size
+        updated += len(updates)
+        if not args.dry_run:
+            save_checkpoint(args.checkpoint, last_id, processed, stale_users)
+        rate = (processed - resumed_from) / max(time.perf_counter() - started, 1e-9)
+        print(f"\r{processed} processed, {updated} re-scored ({rate:.0f}/s)", end="", flush=True)
+
+    # Keep a bounded number of batches in flight and write them back in
+    # _id order, so the checkpoint never skips an unwritten batch
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        pending = deque()
+        for batch in iter_batches(cursor, args.batch_size):
+            pending.append((batch[-1][0], len(batch), pool.submit(rescore_batch, batch)))
+            if len(pending) >= args.workers * 2:
+                batch_last_id, size, future = pending.popleft()
+                flush(batch_last_id, size, future.result())
+        while pending:
+            batch_last_id, size, future = pending.popleft()
+            flush(batch_last_id, size, future.result())
+
+    print(f"\nDone: {updated} interviews re-scored in {time.perf_counter() - started:.1f}s")
+
+    if stale_users and not args.dry_run:
+        print(f"Rebuilding progress rollups for {len(stale_users)} users")
+        for user_email in sorted(stale_users):
+            rebuild_user_progress(db.user_progress, interviews, user_email)
+        stale_users.clear()
+        save_checkpoint(args.checkpoint, last_id, processed, stale_users)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,36 @@
 # response_analyzer.py
+import os
 import re
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
 import spacy
 import language_tool_python
-from textblob import TextBlob
+from tone_lexicon import get_tone_scorer
+from sentences import chunk_sentences
+from scoring import (SCORING_VERSION, SHORT_RESPONSE_SUGGESTIONS, categorize_tone, get_overall_score,
+                     generate_suggestions, collect_raw_metrics)
 from nltk.corpus import stopwords
 import nltk
 from nltk.tokenize import sent_tokenize, word_tokenize
 import traceback
+import logging
 
 # Download NLTK resources
 nltk.download('punkt')
 nltk.download('stopwords')
 
+logger = logging.getLogger(__name__)
+
+# Long texts are checked in sentence-aligned chunks of at most this many characters
+GRAMMAR_CHUNK_CHARS = int(os.getenv("GRAMMAR_CHUNK_CHARS", "2000"))
+GRAMMAR_MAX_WORKERS = int(os.getenv("GRAMMAR_MAX_WORKERS", str(os.cpu_count() or 4)))
+
 class ResponseAnalyzer:
     def __init__(self):
         # Initialize NLP tools
         self.nlp = spacy.load('en_core_web_sm')
         self.language_tool = language_tool_python.LanguageTool('en-US')
+        self.grammar_pool = ThreadPoolExecutor(max_workers=GRAMMAR_MAX_WORKERS)
         self.stop_words = set(stopwords.words('english'))
         
         # Define common filler words
@@ -26,8 +40,12 @@ class ResponseAnalyzer:
             'sort of', 'well', 'just', 'stuff', 'things', 'okay', 'hmm', 'yeah'
         }
 
-    def analyze_text_response(self, text):
-        """Main method to analyze text responses"""
+    def analyze_text_response(self, text, answers=None):
+        """Main method to analyze text responses
+
+        answers optionally holds the individual answer texts, used for the
+        per-answer tone timeline.
+        """
         try:
             if not text or not isinstance(text, str):
                 raise ValueError("Invalid text input")
@@ -43,7 +61,7 @@ class ResponseAnalyzer:
             grammar_results = self.analyze_grammar(text)
             stop_word_results = self.analyze_stop_words(text)
             filler_word_results = self.analyze_filler_words(text)
-            tone_results = self.analyze_tone(text)
+            tone_results = self.analyze_tone(text, answers)
             
             # Calculate scores
             scores = self.get_overall_score(
@@ -65,6 +83,14 @@ class ResponseAnalyzer:
             # Prepare final response
             return {
                 "scores": scores,
+                "scoring_version": SCORING_VERSION,
+                "short_response": False,
+                "raw_metrics": collect_raw_metrics(
+                    grammar_results,
+                    stop_word_results,
+                    filler_word_results,
+                    tone_results
+                ),
                 "word_count": len(word_tokenize(text)),
                 "sentence_count": len(sent_tokenize(text)),
                 "improvement_suggestions": suggestions,
@@ -88,12 +114,14 @@ class ResponseAnalyzer:
                     "subjectivity_score": tone_results['subjectivity_score'],
                     "formality_score": tone_results['formality_score'],
                     "words_per_sentence": tone_results['words_per_sentence'],
-                    "tone_categories": tone_results['tone_categories']
+                    "tone_categories": tone_results['tone_categories'],
+                    "timeline": tone_results['timeline'],
+                    "answers": tone_results['answers']
                 }
             }
 
         except Exception as e:
-            print(f"Error in analyze_text_response: {str(e)}")
+            logger.exception("Error in analyze_text_response")
             return {
                 "error": str(e),
                 "traceback": traceback.format_exc()
@@ -106,20 +134,35 @@ class ResponseAnalyzer:
         # Normalize whitespace
         return ' '.join(text.split())
 
+    def chunk_sentences(self, text):
+        """Group the distinct sentences of text into chunks for LanguageTool"""
+        return chunk_sentences(text, GRAMMAR_CHUNK_CHARS)
+
     def analyze_grammar(self, text):
         """Analyze grammatical errors in the text."""
-        matches = self.language_tool.check(text)
+        # Repeated sentences are checked once and chunks are checked in parallel
+        chunks, occurrences = self.chunk_sentences(text)
+        results = self.grammar_pool.map(self.language_tool.check, [chunk[0] for chunk in chunks])
 
         errors = []
-        for match in matches:
-            # Filter out style suggestions and focus on grammar errors
-            if match.ruleIssueType in ['grammar', 'typos', 'punctuation']:
-                errors.append({
-                    'message': match.message,
-                    'context': match.context,
-                    'suggestions': match.replacements if match.replacements else [],
-                    'type': match.ruleId
-                })
+        for (_, offsets, sentences), matches in zip(chunks, results):
+            for match in matches:
+                # Filter out style suggestions and focus on grammar errors
+                if match.ruleIssueType not in ['grammar', 'typos', 'punctuation']:
+                    continue
+                index = max(0, bisect_right(offsets, match.offset) - 1)
+                local_offset = match.offset - offsets[index]
+                # Report the error everywhere the sentence appears in the original text
+                for sentence_start in occurrences[sentences[index]]:
+                    errors.append({
+                        'message': match.message,
+                        'context': match.context,
+                        'suggestions': match.replacements if match.replacements else [],
+                        'type': match.ruleId,
+                        'offset': sentence_start + local_offset,
+                        'length': match.errorLength
+                    })
+        errors.sort(key=lambda error: error['offset'])
 
         grammar_analysis = {
             'error_count': len(errors),
@@ -187,119 +230,29 @@ class ResponseAnalyzer:
             'total_words': total_words
         }
 
-    def analyze_tone(self, text):
-        """Analyze the tone of the text."""
-        # Use TextBlob for sentiment and subjectivity analysis
-        blob = TextBlob(text)
-        sentiment = blob.sentiment
-
-        # Calculate sentence complexity
-        sentences = sent_tokenize(text)
-        words_per_sentence = sum(len(word_tokenize(s)) for s in sentences) / max(1, len(sentences))
-
-        # Define tone categories based on analysis
-        tone_categories = []
-
-        # Sentiment-based categories
-        if sentiment.polarity > 0.3:
-            tone_categories.append('Positive')
-        elif sentiment.polarity < -0.3:
-            tone_categories.append('Negative')
-        else:
-            tone_categories.append('Neutral')
-
-        # Formality assessment
-        formality_score = 0
-        contractions_count = len(re.findall(r'\b\w+\'[a-z]+\b', text.lower()))
-        first_person_count = len(re.findall(r'\b(i|me|my|mine|myself)\b', text.lower()))
-        
-        formality_score += (1 - sentiment.subjectivity) * 3
-        formality_score -= (contractions_count / max(1, len(sentences))) * 2
-        formality_score -= (first_person_count / max(1, len(word_tokenize(text)))) * 3
+    def analyze_tone(self, text, answers=None):
+        """Analyze the tone of the text, per sentence, per answer and overall."""
+        # Score each answer separately when we have them, else the text as one block
+        segments = [self.clean_text(a) for a in answers] if answers else [text]
+        timeline, answer_tones, overall = get_tone_scorer().score(segments)
 
-        if formality_score > 2:
-            tone_categories.append('Formal')
-        elif formality_score < 0:
-            tone_categories.append('Casual')
-        else:
-            tone_categories.append('Moderately formal')
+        formality_score = overall['formality']
+        tone_categories = categorize_tone(overall['polarity'], formality_score)
 
         return {
-            'sentiment_score': sentiment.polarity,
-            'subjectivity_score': sentiment.subjectivity,
+            'sentiment_score': overall['polarity'],
+            'subjectivity_score': overall['subjectivity'],
             'formality_score': formality_score,
-            'words_per_sentence': words_per_sentence,
-            'tone_categories': tone_categories
+            'words_per_sentence': overall['word_count'] / max(1, overall['sentence_count']),
+            'tone_categories': tone_categories,
+            'timeline': timeline,
+            'answers': answer_tones if answers else []
         }
 
-    def get_overall_score(self, grammar_analysis, stop_word_analysis, filler_analysis, tone_analysis):
-        """Calculate an overall score based on all the analyses."""
-        # Score components (all from 0-100)
-        grammar_score = max(0, 100 - (grammar_analysis['error_rate'] * 20))
-        stop_word_score = max(0, 100 - (stop_word_analysis['stop_word_percentage'] * 1.5))
-        filler_score = max(0, 100 - (filler_analysis['filler_word_percentage'] * 3))
-        
-        # Tone score based on interview context
-        tone_score = 70  # Base score
-        if 'Formal' in tone_analysis['tone_categories']:
-            tone_score += 15
-        if 'Confident' in tone_analysis['tone_categories']:
-            tone_score += 15
-        if 'Negative' in tone_analysis['tone_categories']:
-            tone_score -= 20
-
-        # Calculate weighted overall score
-        overall_score = (
-            grammar_score * 0.35 +
-            stop_word_score * 0.15 +
-            filler_score * 0.20 +
-            tone_score * 0.30
-        )
-
-        return {
-            'grammar_score': min(100, max(0, grammar_score)),
-            'stop_word_score': min(100, max(0, stop_word_score)),
-            'filler_score': min(100, max(0, filler_score)),
-            'tone_score': min(100, max(0, tone_score)),
-            'overall_score': min(100, max(0, overall_score))
-        }
-
-    def generate_suggestions(self, grammar_analysis, stop_word_analysis, filler_analysis, tone_analysis, scores):
-        """Generate personalized suggestions for improvement."""
-        suggestions = []
-
-        # Grammar suggestions
-        if scores['grammar_score'] < 80:
-            if grammar_analysis['error_count'] > 0:
-                common_errors = sorted(grammar_analysis['error_types'].items(), key=lambda x: x[1], reverse=True)
-                if common_errors:
-                    suggestions.append(f"Focus on improving your {common_errors[0][0].lower()} errors, which appeared {common_errors[0][1]} times.")
-            suggestions.append("Consider using grammar checking tools before important interviews.")
-
-        # Stop word suggestions
-        if scores['stop_word_score'] < 80:
-            most_common = stop_word_analysis['most_common_stop_words']
-            if most_common:
-                suggestions.append(f"Try to reduce the use of common stop words like '{most_common[0][0]}' which appeared {most_common[0][1]} times.")
-
-        # Filler word suggestions
-        if scores['filler_score'] < 80:
-            most_common = filler_analysis['most_common_fillers']
-            if most_common:
-                suggestions.append(f"Work on reducing filler words like '{most_common[0][0]}' which appeared {most_common[0][1]} times.")
-            suggestions.append("Practice pausing instead of using filler words to gather your thoughts.")
-
-        # Tone suggestions
-        if 'Casual' in tone_analysis['tone_categories']:
-            suggestions.append("Your tone is casual. For interviews, consider adopting a more formal tone while remaining authentic.")
-
-        if 'Negative' in tone_analysis['tone_categories']:
-            suggestions.append("Your tone appears somewhat negative. Try to maintain a positive or neutral tone during interviews.")
-
-        if tone_analysis['subjectivity_score'] > 0.7:
-            suggestions.append("Your responses are highly subjective. Try to balance with more objective statements and facts when appropriate.")
-
-        return suggestions
+    # Scoring only depends on the collected metrics, so it lives in scoring.py
+    # where the offline re-scoring job can use it without loading NLP models
+    get_overall_score = staticmethod(get_overall_score)
+    generate_suggestions = staticmethod(generate_suggestions)
 
     def generate_short_response_analysis(self, text):
         """Handle very short responses"""
@@ -311,12 +264,12 @@ class ResponseAnalyzer:
                 "filler_score": 0,
                 "tone_score": 0
             },
+            "scoring_version": SCORING_VERSION,
+            "short_response": True,
+            "raw_metrics": None,
             "word_count": len(word_tokenize(text)),
             "sentence_count": len(sent_tokenize(text)),
-            "improvement_suggestions": [
-                "Please provide more detailed responses",
-                "Aim for at least 2-3 complete sentences"
-            ],
+            "improvement_suggestions": list(SHORT_RESPONSE_SUGGESTIONS),
             "grammar_analysis": {
                 "error_count": 0,
                 "error_rate": 0,
@@ -337,6 +290,8 @@ class ResponseAnalyzer:
                 "subjectivity_score": 0,
                 "formality_score": 0,
                 "words_per_sentence": 0,
-                "tone_categories": ["Neutral"]
+                "tone_categories": ["Neutral"],
+                "timeline": [],
+                "answers": []
             }
         }
\ No newline at end of file
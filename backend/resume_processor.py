@@ -0,0 +1,75 @@
+# resume_processor.py
+import re
+import threading
+import fitz  # PyMuPDF
+import spacy
+from nltk.corpus import stopwords
+
+# ======== SKILLS DB ===========
+SKILLS_DB = {"python", "java", "c", "c++", "javascript", "react", "html", "css", 
+             "node.js", "express.js", "mongodb", "sql", "mysql", "django", "flask", 
+             "aws", "azure", "docker", "kubernetes", "pandas", "numpy", "tensorflow", 
+             "keras", "machine learning", "nlp", "deep learning"}
+
+_nlp = None
+_stop_words = None
+_load_lock = threading.Lock()
+
+
+def get_nlp():
+    """spaCy pipeline, loaded once per process"""
+    global _nlp
+    if _nlp is None:
+        with _load_lock:
+            if _nlp is None:
+                _nlp = spacy.load("en_core_web_sm")
+    return _nlp
+
+
+def get_stop_words():
+    global _stop_words
+    if _stop_words is None:
+        _stop_words = set(stopwords.words('english'))
+    return _stop_words
+
+
+def extract_text_from_pdf(pdf_path):
+    with fitz.open(pdf_path) as doc:
+        return " ".join([page.get_text("text") for page in doc])
+
+
+def extract_text_from_pdf_bytes(data):
+    with fitz.open(stream=data, filetype="pdf") as doc:
+        return " ".join([page.get_text("text") for page in doc])
+
+
+def preprocess_text(text):
+    text = text.lower()
+    text = re.sub(r'[^a-z\s]', '', text)
+    words = text.split()
+    stop_words = get_stop_words()
+    return " ".join([w for w in words if w not in stop_words])
+
+
+def extract_skills(text):
+    doc = get_nlp()(text)
+    found = set()
+    for token in doc:
+        if token.text in SKILLS_DB:
+            found.add(token.text)
+    for chunk in doc.noun_chunks:
+        if chunk.text in SKILLS_DB:
+            found.add(chunk.text)
+    return list(found)
+
+
+def process_resume(path):
+    raw = extract_text_from_pdf(path)
+    cleaned = preprocess_text(raw)
+    return extract_skills(cleaned)
+
+
+def process_resume_bytes(data):
+    raw = extract_text_from_pdf_bytes(data)
+    cleaned = preprocess_text(raw)
+    return extract_skills(cleaned)
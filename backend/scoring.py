@@ -0,0 +1,186 @@
+# scoring.py
+# Scores and suggestions computed from analysis metrics. Kept free of NLP
+# dependencies so stored interviews can be re-scored offline.
+
+# Bump whenever weights or thresholds below change
+SCORING_VERSION = 1
+
+# Returned instead of scores for responses too short to analyze. Analyses
+# stored before the short_response flag are recognized by these suggestions.
+SHORT_RESPONSE_SUGGESTIONS = [
+    "Please provide more detailed responses",
+    "Aim for at least 2-3 complete sentences"
+]
+
+
+def categorize_tone(sentiment_score, formality_score):
+    """Map raw sentiment and formality scores to tone categories."""
+    tone_categories = []
+
+    # Sentiment-based categories
+    if sentiment_score > 0.3:
+        tone_categories.append('Positive')
+    elif sentiment_score < -0.3:
+        tone_categories.append('Negative')
+    else:
+        tone_categories.append('Neutral')
+
+    # Formality assessment
+    if formality_score > 2:
+        tone_categories.append('Formal')
+    elif formality_score < 0:
+        tone_categories.append('Casual')
+    else:
+        tone_categories.append('Moderately formal')
+
+    return tone_categories
+
+
+def get_overall_score(grammar_analysis, stop_word_analysis, filler_analysis, tone_analysis):
+    """Calculate an overall score based on all the analyses."""
+    # Score components (all from 0-100)
+    grammar_score = max(0, 100 - (grammar_analysis['error_rate'] * 20))
+    stop_word_score = max(0, 100 - (stop_word_analysis['stop_word_percentage'] * 1.5))
+    filler_score = max(0, 100 - (filler_analysis['filler_word_percentage'] * 3))
+
+    # Tone score based on interview context
+    tone_score = 70  # Base score
+    if 'Formal' in tone_analysis['tone_categories']:
+        tone_score += 15
+    if 'Confident' in tone_analysis['tone_categories']:
+        tone_score += 15
+    if 'Negative' in tone_analysis['tone_categories']:
+        tone_score -= 20
+
+    # Calculate weighted overall score
+    overall_score = (
+        grammar_score * 0.35 +
+        stop_word_score * 0.15 +
+        filler_score * 0.20 +
+        tone_score * 0.30
+    )
+
+    return {
+        'grammar_score': min(100, max(0, grammar_score)),
+        'stop_word_score': min(100, max(0, stop_word_score)),
+        'filler_score': min(100, max(0, filler_score)),
+        'tone_score': min(100, max(0, tone_score)),
+        'overall_score': min(100, max(0, overall_score))
+    }
+
+def generate_suggestions(grammar_analysis, stop_word_analysis, filler_analysis, tone_analysis, scores):
+    """Generate personalized suggestions for improvement."""
+    suggestions = []
+
+    # Grammar suggestions
+    if scores['grammar_score'] < 80:
+        if grammar_analysis['error_count'] > 0:
+            common_errors = sorted(grammar_analysis['error_types'].items(), key=lambda x: x[1], reverse=True)
+            if common_errors:
+                suggestions.append(f"Focus on improving your {common_errors[0][0].lower()} errors, which appeared {common_errors[0][1]} times.")
+        suggestions.append("Consider using grammar checking tools before important interviews.")
+
+    # Stop word suggestions
+    if scores['stop_word_score'] < 80:
+        most_common = stop_word_analysis['most_common_stop_words']
+        if most_common:
+            suggestions.append(f"Try to reduce the use of common stop words like '{most_common[0][0]}' which appeared {most_common[0][1]} times.")
+
+    # Filler word suggestions
+    if scores['filler_score'] < 80:
+        most_common = filler_analysis['most_common_fillers']
+        if most_common:
+            suggestions.append(f"Work on reducing filler words like '{most_common[0][0]}' which appeared {most_common[0][1]} times.")
+        suggestions.append("Practice pausing instead of using filler words to gather your thoughts.")
+
+    # Tone suggestions
+    if 'Casual' in tone_analysis['tone_categories']:
+        suggestions.append("Your tone is casual. For interviews, consider adopting a more formal tone while remaining authentic.")
+
+    if 'Negative' in tone_analysis['tone_categories']:
+        suggestions.append("Your tone appears somewhat negative. Try to maintain a positive or neutral tone during interviews.")
+
+    if tone_analysis['subjectivity_score'] > 0.7:
+        suggestions.append("Your responses are highly subjective. Try to balance with more objective statements and facts when appropriate.")
+
+    return suggestions
+
+
+def collect_raw_metrics(grammar_analysis, stop_word_analysis, filler_analysis, tone_analysis):
+    """The per-component measurements scoring depends on, stored with each analysis."""
+    return {
+        "grammar": {
+            "error_count": grammar_analysis['error_count'],
+            "error_rate": grammar_analysis['error_rate'],
+            "error_types": grammar_analysis['error_types']
+        },
+        "stop_words": {
+            "stop_word_percentage": stop_word_analysis['stop_word_percentage'],
+            "most_common_stop_words": stop_word_analysis['most_common_stop_words']
+        },
+        "fillers": {
+            "filler_word_percentage": filler_analysis['filler_word_percentage'],
+            "most_common_fillers": filler_analysis['most_common_fillers']
+        },
+        "tone": {
+            "sentiment_score": tone_analysis['sentiment_score'],
+            "subjectivity_score": tone_analysis['subjectivity_score'],
+            "formality_score": tone_analysis['formality_score']
+        }
+    }
+
+
+def raw_metrics_from_analysis(analysis):
+    """Rebuild raw metrics from an analysis stored before they were persisted."""
+    tone = analysis.get('tone_analysis', {})
+    return collect_raw_metrics(
+        analysis.get('grammar_analysis', {}),
+        analysis.get('stop_word_analysis', {}),
+        analysis.get('filler_word_analysis', {}),
+        tone
+    )
+
+
+def rescore_analysis(analysis):
+    """Recompute tone categories, scores and suggestions for a stored analysis.
+
+    Returns None for analyses that cannot be re-scored (short responses).
+    """
+    if analysis.get('short_response'):
+        return None
+    if 'raw_metrics' in analysis:
+        # Stored with raw metrics; None means there was nothing to measure
+        raw_metrics = analysis['raw_metrics']
+        if raw_metrics is None:
+            return None
+    else:
+        # Stored before raw metrics were kept
+        if ('grammar_analysis' not in analysis
+                or analysis.get('improvement_suggestions') == SHORT_RESPONSE_SUGGESTIONS):
+            return None
+        raw_metrics = raw_metrics_from_analysis(analysis)
+
+    tone = dict(raw_metrics['tone'])
+    tone['tone_categories'] = categorize_tone(tone['sentiment_score'], tone['formality_score'])
+
+    scores = get_overall_score(
+        raw_metrics['grammar'],
+        raw_metrics['stop_words'],
+        raw_metrics['fillers'],
+        tone
+    )
+    suggestions = generate_suggestions(
+        raw_metrics['grammar'],
+        raw_metrics['stop_words'],
+        raw_metrics['fillers'],
+        tone,
+        scores
+    )
+
+    return {
+        "scores": scores,
+        "improvement_suggestions": suggestions,
+        "tone_categories": tone['tone_categories'],
+        "raw_metrics": raw_metrics,
+        "scoring_version": SCORING_VERSION
+    }
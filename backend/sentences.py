@@ -0,0 +1,74 @@
+# sentences.py
+import re
+
+# A run of . ! ? closes a sentence only when whitespace or the end of the
+# text follows, so "Node.js", "2.5" and "o.O" stay whole. Newlines always
+# close a sentence.
+SENTENCE_END_RE = re.compile(r"[.!?]+(?=\s|$)|\n")
+# Words whose trailing period does not end a sentence
+ABBREVIATIONS = {
+    "e.g", "i.e", "etc", "vs", "cf", "approx", "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "inc", "ltd"
+}
+
+
+def sentence_spans(text):
+    """(start, end) of every sentence in text, closing punctuation included"""
+    spans = []
+    start = 0
+    for match in SENTENCE_END_RE.finditer(text):
+        if match.group() == ".":
+            words = text[start:match.start()].split()
+            if words and words[-1].lower().lstrip("(\"'") in ABBREVIATIONS:
+                continue
+        end = match.start() if match.group() == "\n" else match.end()
+        _add_span(spans, text, start, end)
+        start = match.end()
+    _add_span(spans, text, start, len(text))
+    return spans
+
+
+def _add_span(spans, text, start, end):
+    while start < end and text[start].isspace():
+        start += 1
+    if start < end:
+        spans.append((start, end))
+
+
+def chunk_sentences(text, max_chars):
+    """Group the distinct sentences of text into chunks of about max_chars.
+
+    Sentences that follow each other in text keep their original separator,
+    so a chunk is a verbatim slice of text wherever no repeated sentence was
+    dropped. Returns the chunks as (chunk_text, sentence_offsets, sentences)
+    and a map from each sentence to every position it occurs at in text.
+    """
+    spans = sentence_spans(text)
+    occurrences = {}
+    for start, end in spans:
+        occurrences.setdefault(text[start:end], []).append(start)
+
+    chunks = []
+    parts, offsets, sentences, length = [], [], [], 0
+    previous_end = None
+    for start, end in spans:
+        sentence = text[start:end]
+        if occurrences[sentence][0] != start:
+            # Repeats are checked once, at their first occurrence
+            previous_end = None
+            continue
+        if sentences and length + len(sentence) > max_chars:
+            chunks.append(("".join(parts), offsets, sentences))
+            parts, offsets, sentences, length = [], [], [], 0
+        if sentences:
+            separator = text[previous_end:start] if previous_end is not None else " "
+            parts.append(separator)
+            length += len(separator)
+        offsets.append(length)
+        sentences.append(sentence)
+        parts.append(sentence)
+        length += len(sentence)
+        previous_end = end
+    if sentences:
+        chunks.append(("".join(parts), offsets, sentences))
+
+    return chunks, occurrences
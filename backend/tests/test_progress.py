@@ -0,0 +1,37 @@
+from progress import interview_rollup_changes, summarize_progress
+
+
+def test_rollup_credits_each_skill_with_its_own_answers():
+    interview = {
+        "skills": ["python", "node.js"],
+        "analysis": {
+            "scores": {"overall_score": 70},
+            "relevance_analysis": {"answers": [
+                {"skill": "python", "relevance": 0.8},
+                {"skill": "node.js", "relevance": 0.2},
+                {"skill": "python", "relevance": 0.6}
+            ]},
+            "tone_analysis": {"answers": [{"polarity": 0.5}, {"polarity": -0.1}, {"polarity": 0.1}]}
+        }
+    }
+    increments, pushes, updates = interview_rollup_changes(interview)
+    assert increments["skills.python.total_relevance"] == 0.8 + 0.6
+    assert increments["skills.python.relevance_count"] == 2
+    assert increments["skills.node_js.total_polarity"] == -0.1
+    assert updates["skills.node_js.name"] == "node.js"
+    assert pushes["recent.overall_score"] == 70.0
+
+
+def test_best_and_worst_skills_are_disjoint():
+    skills = {
+        name: {"name": name, "count": 1, "total_score": 70, "relevance_count": 1, "total_relevance": relevance}
+        for name, relevance in [("python", 0.8), ("sql", 0.5), ("react", 0.1)]
+    }
+    skills["docker"] = {"name": "docker", "count": 1, "total_score": 70}
+    summary = summarize_progress({"interview_count": 1, "skills": skills})
+
+    best = [s["skill"] for s in summary["best_skills"]]
+    worst = [s["skill"] for s in summary["worst_skills"]]
+    assert best == ["python", "sql"]
+    assert worst == ["react"]
+    assert [s["skill"] for s in summary["skills"]] == ["python", "sql", "react", "docker"]
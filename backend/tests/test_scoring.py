@@ -0,0 +1,63 @@
+from scoring import SCORING_VERSION, SHORT_RESPONSE_SUGGESTIONS, collect_raw_metrics, rescore_analysis
+
+
+def full_analysis():
+    grammar = {"error_count": 1, "error_rate": 0.5, "error_types": {"Grammar": 1}}
+    stop_words = {"stop_word_count": 10, "stop_word_percentage": 40.0, "most_common_stop_words": [["the", 4]]}
+    fillers = {"filler_word_count": 2, "filler_word_percentage": 8.0, "most_common_fillers": [["um", 2]]}
+    tone = {"sentiment_score": 0.1, "subjectivity_score": 0.4, "formality_score": 2.5}
+    return {
+        "scores": {"overall_score": 50},
+        "short_response": False,
+        "raw_metrics": collect_raw_metrics(grammar, stop_words, fillers, tone),
+        "word_count": 25,
+        "grammar_analysis": grammar,
+        "stop_word_analysis": stop_words,
+        "filler_word_analysis": fillers,
+        "tone_analysis": dict(tone, tone_categories=["Neutral", "Formal"])
+    }
+
+
+def short_analysis():
+    # "um yes i know." is four words, but word_tokenize counts the period too
+    return {
+        "scores": {"overall_score": 0, "grammar_score": 0, "stop_word_score": 0, "filler_score": 0, "tone_score": 0},
+        "short_response": True,
+        "raw_metrics": None,
+        "word_count": 5,
+        "improvement_suggestions": list(SHORT_RESPONSE_SUGGESTIONS),
+        "grammar_analysis": {"error_count": 0, "error_rate": 0, "error_types": {}},
+        "stop_word_analysis": {"stop_word_count": 0, "stop_word_percentage": 0, "most_common_stop_words": []},
+        "filler_word_analysis": {"filler_word_count": 0, "filler_word_percentage": 0, "most_common_fillers": []},
+        "tone_analysis": {"sentiment_score": 0, "subjectivity_score": 0, "formality_score": 0}
+    }
+
+
+def test_rescores_from_raw_metrics():
+    result = rescore_analysis(full_analysis())
+    assert result["scoring_version"] == SCORING_VERSION
+    assert result["tone_categories"] == ["Neutral", "Formal"]
+    assert result["scores"]["grammar_score"] == 90
+    assert 0 < result["scores"]["overall_score"] <= 100
+
+
+def test_short_response_is_not_rescored():
+    assert rescore_analysis(short_analysis()) is None
+
+
+def test_stored_none_raw_metrics_is_not_rescored():
+    analysis = short_analysis()
+    del analysis["short_response"]
+    assert rescore_analysis(analysis) is None
+
+
+def test_legacy_analysis_is_rescored_from_stored_fields():
+    analysis = full_analysis()
+    del analysis["raw_metrics"], analysis["short_response"]
+    assert rescore_analysis(analysis)["scores"] == rescore_analysis(full_analysis())["scores"]
+
+
+def test_legacy_short_response_is_not_rescored():
+    analysis = short_analysis()
+    del analysis["raw_metrics"], analysis["short_response"]
+    assert rescore_analysis(analysis) is None
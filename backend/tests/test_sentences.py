@@ -0,0 +1,35 @@
+from sentences import chunk_sentences, sentence_spans
+
+TEXT = "I built APIs with Node.js and Express.js over 2.5 years. It went well, e.g. on uptime! Did it?"
+
+
+def test_periods_inside_words_and_numbers_do_not_split():
+    assert [TEXT[start:end] for start, end in sentence_spans(TEXT)] == [
+        "I built APIs with Node.js and Express.js over 2.5 years.",
+        "It went well, e.g. on uptime!",
+        "Did it?"
+    ]
+
+
+def test_newlines_close_sentences():
+    assert sentence_spans("no ending\nsecond one") == [(0, 9), (10, 20)]
+
+
+def test_chunks_are_verbatim_and_offsets_match_original_text():
+    text = "Skills: Node.js  and 2.5 years.   Skills: Node.js  and 2.5 years. Next one."
+    chunks, occurrences = chunk_sentences(text, max_chars=2000)
+
+    assert len(chunks) == 1
+    chunk_text, offsets, sentences = chunks[0]
+    assert chunk_text == "Skills: Node.js  and 2.5 years. Next one."
+    for offset, sentence in zip(offsets, sentences):
+        assert chunk_text[offset:offset + len(sentence)] == sentence
+        for start in occurrences[sentence]:
+            assert text[start:start + len(sentence)] == sentence
+    assert occurrences["Skills: Node.js  and 2.5 years."] == [0, 34]
+
+
+def test_adjacent_sentences_keep_their_separator_across_chunks():
+    text = "First sentence here.  Second sentence here. Third."
+    chunks, _ = chunk_sentences(text, max_chars=45)
+    assert [chunk[0] for chunk in chunks] == ["First sentence here.  Second sentence here.", "Third."]
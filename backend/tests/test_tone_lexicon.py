@@ -0,0 +1,64 @@
+import pytest
+
+TextBlob = pytest.importorskip("textblob").TextBlob
+from tone_lexicon import LexiconToneScorer
+
+
+SENTENCES = [
+    "very good.",
+    "not good.",
+    "not very good.",
+    "no good.",
+    "extremely bad.",
+    "It was terribly slow.",
+    "I am not a good fit.",
+    "really is a good plan.",
+    "The answer was very very good.",
+    "This is a great and really useful project.",
+    "The team was not happy with the results.",
+    # TextBlob splits contractions, so "n't" never negates
+    "This isn't good.",
+    "The candidate was good but the team wasn't satisfied.",
+    "I am so happy :) it was awesome.",
+    "It was great :) really.",
+    "so (!) fine",
+    "good!!",
+    "not good!",
+    "very good! bad.",
+    "really not very good.",
+    "We used Node.js 2.5 and it was a well-known, really good fit.",
+]
+
+
+@pytest.fixture(scope="module")
+def scorer():
+    return LexiconToneScorer()
+
+
+@pytest.mark.parametrize("sentence", SENTENCES)
+def test_matches_textblob(scorer, sentence):
+    expected = TextBlob(sentence).sentiment
+    _, _, aggregate = scorer.score([sentence])
+    assert aggregate["polarity"] == pytest.approx(expected.polarity, abs=1e-3)
+    assert aggregate["subjectivity"] == pytest.approx(expected.subjectivity, abs=1e-3)
+
+
+def test_negation_carries_across_modifier(scorer):
+    _, _, aggregate = scorer.score(["not very good."])
+    assert aggregate["polarity"] < 0
+
+
+def test_rows_per_sentence_and_segment(scorer):
+    sentences, segments, _ = scorer.score(["Very good. Not good.", "Extremely bad."])
+    assert [row["segment"] for row in sentences] == [0, 0, 1]
+    assert [row["segment"] for row in segments] == [0, 1]
+    assert sentences[1]["polarity"] == pytest.approx(TextBlob("not good.").sentiment.polarity, abs=1e-3)
+
+
+def test_sentences_split_only_at_sentence_ends(scorer):
+    text = "We moved to Node.js 2.5 last year. It was great!"
+    sentences, _, _ = scorer.score([text])
+    assert [text[row["start"]:row["end"]] for row in sentences] == [
+        "We moved to Node.js 2.5 last year.", "It was great!"
+    ]
+    assert sentences[1]["polarity"] == pytest.approx(TextBlob("It was great!").sentiment.polarity, abs=1e-3)
@@ -0,0 +1,301 @@
+# tone_lexicon.py
+import os
+import re
+import threading
+import xml.etree.ElementTree as ET
+from collections import defaultdict
+import numpy as np
+import textblob.en
+from textblob._text import EMOTICONS
+from sentences import sentence_spans
+
+# TextBlob ships the pattern sentiment lexicon it scores with; we reuse the
+# same word scores but apply them with array operations instead of per-word
+# Python objects.
+LEXICON_PATH = os.path.join(os.path.dirname(textblob.en.__file__), "en-sentiment.xml")
+
+
+def _moods():
+    """Polarity of each emoticon TextBlob scores as its own assessment, plus "(!)" for irony"""
+    moods = {"(!)": 0.0}
+    for (_, polarity), faces in EMOTICONS.items():
+        for face in faces:
+            # TextBlob takes the first group a face appears in and skips alphabetic ones like "XD"
+            if not face.isalpha() and len(face) <= 5:
+                moods.setdefault(face.lower(), polarity)
+    return moods
+
+
+MOODS = _moods()
+
+WORD_RE = re.compile(r"[a-z]+(?:'[a-z]+)?")
+# Tokens as TextBlob's tokenizer splits them: "isn't" -> "is", "n", "t", while
+# "well-known" and "Node.js" stay whole. Other one-character tokens never
+# affect an assessment, so they are skipped.
+TOKEN_RE = re.compile(
+    "(?:" + "|".join(re.escape(face) for face in sorted(MOODS, key=len, reverse=True)) + r")(?=[\s!]|$)"
+    r"|!|[a-z]+?(?=n't\b)|[a-z0-9]+(?:[-.][a-z0-9]+)*"
+)
+# TextBlob also lists "n't", but its tokenizer splits contractions so that
+# never matches; "isn't good" scores like "good"
+NEGATIONS = {"no", "not", "never"}
+FIRST_PERSON = {"i", "me", "my", "mine", "myself"}
+
+_scorer = None
+_scorer_lock = threading.Lock()
+
+
+def _mean(rows):
+    return tuple(sum(column) / len(column) for column in zip(*rows))
+
+
+def load_lexicon(path=LEXICON_PATH):
+    """Polarity/subjectivity/intensity per word form, averaged the way TextBlob does.
+
+    Senses are averaged per part of speech, then over parts of speech. Like
+    TextBlob, adverbs are derived from adjectives ("terrible" -> "terribly").
+    Returns {form: (polarity, subjectivity, intensity, is_adverb)}.
+    """
+    senses = defaultdict(lambda: defaultdict(list))
+    for word in ET.parse(path).getroot().iter("word"):
+        form = word.get("form")
+        if form:
+            senses[form][word.get("pos")].append((
+                float(word.get("polarity", 0)),
+                float(word.get("subjectivity", 0)),
+                float(word.get("intensity", 1))
+            ))
+
+    by_pos = {}
+    for form, pos_senses in senses.items():
+        scores = {pos: _mean(rows) for pos, rows in pos_senses.items()}
+        scores[None] = _mean(list(scores.values()))
+        by_pos[form] = scores
+
+    for form, scores in list(by_pos.items()):
+        if "JJ" in scores:
+            stem = form[:-1] + "i" if form.endswith("y") else form
+            stem = stem[:-2] if stem.endswith("le") else stem
+            adverb = by_pos.setdefault(stem + "ly", {})
+            adverb["RB"] = adverb[None] = scores["JJ"]
+
+    return {
+        form: scores[None] + ("RB" in scores,)
+        for form, scores in by_pos.items()
+        if " " not in form
+    }
+
+
+def _previous(mask, groups):
+    """Index of the closest earlier token in the same group where mask is set, else -1"""
+    index = np.where(mask, np.arange(len(mask)), -1)
+    previous = np.full(len(mask), -1)
+    previous[1:] = np.maximum.accumulate(index)[:-1]
+    same_group = previous >= 0
+    same_group[same_group] = groups[previous[same_group]] == groups[same_group]
+    return np.where(same_group, previous, -1)
+
+
+class LexiconToneScorer:
+    """Scores polarity, subjectivity and formality per sentence and per answer in one pass"""
+
+    def __init__(self, lexicon=None):
+        lexicon = lexicon if lexicon is not None else load_lexicon()
+        self.vocabulary = {form: i for i, form in enumerate(lexicon)}
+        values = list(lexicon.values())
+        self.polarity = np.array([v[0] for v in values] + [0.0])
+        self.subjectivity = np.array([v[1] for v in values] + [0.0])
+        self.intensity = np.array([v[2] for v in values] + [1.0])
+        # Adverbs such as "very" or "extremely" scale the following word
+        self.is_modifier = np.array([v[3] for v in values] + [False])
+        # "really not good": a negation after an "-ly" adverb joins its assessment
+        self.ends_ly = np.array([form.endswith("ly") for form in lexicon] + [False])
+        self.unknown = len(values)
+
+    def score(self, segments):
+        """Score a list of texts (e.g. one per answer).
+
+        Returns per-sentence rows, per-segment rows and the aggregate over all
+        text, each with polarity, subjectivity and formality.
+        """
+        text = "\n".join(segments).lower()
+        segment_starts = np.cumsum([0] + [len(s) + 1 for s in segments[:-1]])
+
+        spans = sentence_spans(text)
+        if not spans:
+            return [], [], self._empty_aggregate()
+        sentence_starts = np.array([start for start, _ in spans])
+        sentence_segments = np.searchsorted(segment_starts, sentence_starts, side="right") - 1
+        n_sentences = len(spans)
+
+        def sentence_of(positions):
+            positions = np.array(positions, dtype=int)
+            return np.clip(np.searchsorted(sentence_starts, positions, side="right") - 1, 0, n_sentences - 1)
+
+        words = list(WORD_RE.finditer(text))
+        word_sentences = sentence_of([m.start() for m in words])
+        word_tokens = [m.group() for m in words]
+        contractions = np.array(["'" in t for t in word_tokens], dtype=float)
+        first_person = np.array([t in FIRST_PERSON for t in word_tokens], dtype=float)
+
+        matches = list(TOKEN_RE.finditer(text))
+        positions = np.array([m.start() for m in matches], dtype=int)
+        token_segments = np.searchsorted(segment_starts, positions, side="right") - 1
+        polarity, subjectivity, assessed = self._assess([m.group() for m in matches], token_segments)
+        assessment_sentences = sentence_of(positions[assessed])
+        polarity, subjectivity = polarity[assessed], subjectivity[assessed]
+
+        def per(groups, size, values=None):
+            return np.bincount(groups, weights=values, minlength=size)
+
+        sentence_rows = self._rows(
+            per(assessment_sentences, n_sentences, polarity),
+            per(assessment_sentences, n_sentences, subjectivity),
+            per(assessment_sentences, n_sentences),
+            per(word_sentences, n_sentences),
+            per(word_sentences, n_sentences, contractions),
+            per(word_sentences, n_sentences, first_person),
+            np.ones(n_sentences)
+        )
+        for i, row in enumerate(sentence_rows):
+            start, end = spans[i]
+            row.update({
+                "sentence": i,
+                "segment": int(sentence_segments[i]),
+                "start": int(start - segment_starts[sentence_segments[i]]),
+                "end": int(end - segment_starts[sentence_segments[i]])
+            })
+
+        n_segments = len(segments)
+        assessment_segments = sentence_segments[assessment_sentences]
+        word_segments = sentence_segments[word_sentences]
+        segment_rows = self._rows(
+            per(assessment_segments, n_segments, polarity),
+            per(assessment_segments, n_segments, subjectivity),
+            per(assessment_segments, n_segments),
+            per(word_segments, n_segments),
+            per(word_segments, n_segments, contractions),
+            per(word_segments, n_segments, first_person),
+            per(sentence_segments, n_segments)
+        )
+        for i, row in enumerate(segment_rows):
+            row["segment"] = i
+
+        aggregate = self._rows(
+            np.array([polarity.sum()]),
+            np.array([subjectivity.sum()]),
+            np.array([len(polarity)]),
+            np.array([len(word_tokens)]),
+            np.array([contractions.sum()]),
+            np.array([first_person.sum()]),
+            np.array([n_sentences])
+        )[0]
+        return sentence_rows, segment_rows, aggregate
+
+    def _assess(self, tokens, token_segments):
+        """Per-token polarity and subjectivity after TextBlob's assessment rules.
+
+        A known word after an adverb (skipping unknown words of up to two
+        letters) is merged with it into one assessment, scaled by the adverb's
+        intensity and clamped to [-1, 1]. A negation (skipping unknown
+        one-letter words) inverts the intensity the next known word passes on,
+        and its whole assessment scores -0.5 times its polarity. Emoticons and
+        "(!)" are assessments of their own, and each "!" scales the polarity
+        of the assessment before it by 1.25. As in TextBlob these rules cross
+        sentence boundaries, but they stop at the end of a segment. Returns
+        polarity, subjectivity and the mask of tokens that end an assessment.
+        """
+        n = len(tokens)
+        if not n:
+            return np.zeros(0), np.zeros(0), np.zeros(0, dtype=bool)
+        ids = np.array([self.vocabulary.get(t, self.unknown) for t in tokens])
+        known = ids != self.unknown
+        mood = np.array([t in MOODS for t in tokens])
+        exclamation = np.array([t == "!" for t in tokens])
+        negation = np.array([t in NEGATIONS for t in tokens]) & ~known
+        lengths = np.array([len(t) for t in tokens])
+
+        # "really is a good": the modifier carries over short unknown words
+        modifier_anchor = _previous(known | ((lengths > 2) & ~negation), token_segments)
+        joined = negation & (modifier_anchor >= 0)
+        joined[joined] = self.is_modifier[ids[modifier_anchor[joined]]] & self.ends_ly[ids[modifier_anchor[joined]]]
+        modifier_anchor = _previous(known | ((lengths > 2) & ~joined), token_segments)
+        modified = known & (modifier_anchor >= 0) & self.is_modifier[ids[modifier_anchor]]
+        # A modified word merges into the latest assessment, usually the adverb's
+        merged_into = _previous(known | mood, token_segments)
+
+        # "not a good": the negation carries over one-letter unknown words
+        negation_anchor = _previous(known | negation | (lengths > 1), token_segments)
+        negated = known & (negation_anchor >= 0) & negation[negation_anchor] & ~joined[negation_anchor]
+
+        intensity = np.where(mood, 1.0, self.intensity[ids])
+        intensity = np.where(negated, 1.0 / np.where(intensity == 0, 1.0, intensity), intensity)
+        scale = np.ones(n)
+        scale[modified] = intensity[merged_into[modified]]
+        polarity = np.where(modified, np.clip(self.polarity[ids] * scale, -1, 1), self.polarity[ids])
+        subjectivity = np.where(modified, np.clip(self.subjectivity[ids] * scale, -1, 1), self.subjectivity[ids])
+        polarity[mood] = [MOODS[t] for t, m in zip(tokens, mood) if m]
+        subjectivity[mood] = 1.0
+
+        # Whatever a modified word merged into is no longer its own assessment
+        absorbed = np.zeros(n, dtype=bool)
+        absorbed[merged_into[modified]] = True
+        assessed = (known | mood) & ~absorbed
+        assessment_ids = np.cumsum((known & ~modified) | mood) - 1
+        n_assessments = assessment_ids[-1] + 1
+        if not n_assessments:
+            return polarity, subjectivity, assessed
+        ends = np.flatnonzero(assessed)
+
+        # "!" boosts the assessment before it unless a later word replaces
+        # its polarity by merging into it
+        target = assessment_ids[exclamation]
+        boosted = target >= 0
+        boosted[boosted] = (ends[target[boosted]] < np.flatnonzero(exclamation)[boosted]) & (
+            token_segments[ends[target[boosted]]] == token_segments[exclamation][boosted]
+        )
+        boosts = np.bincount(target[boosted], minlength=n_assessments)
+        polarity[ends] = np.clip(polarity[ends] * 1.25 ** boosts, -1, 1)
+
+        # A negation anywhere in the merged assessment flips it
+        flips = negated | joined
+        assessment_negated = np.bincount(
+            assessment_ids[flips], minlength=n_assessments
+        ) > 0
+        polarity[ends[assessment_negated]] *= -0.5
+        return polarity, subjectivity, assessed
+
+    @staticmethod
+    def _rows(polarity_sum, subjectivity_sum, assessed, words, contractions, first_person, sentences):
+        scale = np.maximum(assessed, 1)
+        polarity = polarity_sum / scale
+        subjectivity = subjectivity_sum / scale
+        formality = (
+            (1 - subjectivity) * 3
+            - (contractions / np.maximum(sentences, 1)) * 2
+            - (first_person / np.maximum(words, 1)) * 3
+        )
+        return [
+            {
+                "polarity": round(float(p), 4),
+                "subjectivity": round(float(s), 4),
+                "formality": round(float(f), 4),
+                "word_count": int(w),
+                "sentence_count": int(n)
+            }
+            for p, s, f, w, n in zip(polarity, subjectivity, formality, words, sentences)
+        ]
+
+    @staticmethod
+    def _empty_aggregate():
+        return {"polarity": 0.0, "subjectivity": 0.0, "formality": 3.0, "word_count": 0, "sentence_count": 0}
+
+
+def get_tone_scorer():
+    """Return the shared scorer, loading the lexicon on first use"""
+    global _scorer
+    if _scorer is None:
+        with _scorer_lock:
+            if _scorer is None:
+                _scorer = LexiconToneScorer()
+    return _scorer
@@ -0,0 +1,70 @@
+# transcript_store.py
+import json
+import zlib
+import datetime
+from bson import Binary
+
+# Segment fields kept on the interview document; everything else Whisper
+# returns (tokens, logprobs, temperature, ...) goes to the side collection.
+COMPACT_SEGMENT_FIELDS = ("start", "end", "text")
+
+
+def compact_transcript(transcript):
+    """Reduce a Whisper transcription result to text, segment timings and pauses"""
+    if not isinstance(transcript, dict):
+        return {"text": "", "segments": [], "pauses": []}
+
+    segments = []
+    for segment in transcript.get("segments") or []:
+        if not isinstance(segment, dict):
+            continue
+        compact = {field: segment.get(field) for field in COMPACT_SEGMENT_FIELDS}
+        compact["text"] = (compact["text"] or "").strip()
+        segments.append(compact)
+
+    return {
+        "text": (transcript.get("text") or "").strip(),
+        "segments": segments,
+        "pauses": [
+            {"start": p.get("start"), "end": p.get("end")}
+            for p in transcript.get("pauses") or [] if isinstance(p, dict)
+        ]
+    }
+
+
+def has_verbose_data(transcript):
+    """True when the transcript carries more than its compact form"""
+    if not isinstance(transcript, dict):
+        return False
+    return any(
+        isinstance(segment, dict) and set(segment) - set(COMPACT_SEGMENT_FIELDS)
+        for segment in transcript.get("segments") or []
+    )
+
+
+def compress_document(data):
+    return Binary(zlib.compress(json.dumps(data, default=str).encode("utf-8"), 6))
+
+
+def decompress_document(blob):
+    return json.loads(zlib.decompress(bytes(blob)).decode("utf-8"))
+
+
+def store_raw_transcript(collection, interview_id, transcript, key="final"):
+    """Save the verbose transcript, compressed, in the side collection"""
+    collection.update_one(
+        {"interview_id": interview_id, "key": key},
+        {"$set": {
+            "data": compress_document(transcript),
+            "updated_at": datetime.datetime.utcnow()
+        }},
+        upsert=True
+    )
+
+
+def load_raw_transcripts(collection, interview_id):
+    """Fetch and decompress every verbose transcript stored for an interview"""
+    return {
+        doc["key"]: decompress_document(doc["data"])
+        for doc in collection.find({"interview_id": interview_id})
+    }
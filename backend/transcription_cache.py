@@ -0,0 +1,103 @@
+# transcription_cache.py
+import os
+import json
+import datetime
+import threading
+import logging
+from collections import OrderedDict
+from pymongo.errors import OperationFailure
+from transcript_store import compress_document, decompress_document
+
+logger = logging.getLogger(__name__)
+
+CACHE_MAX_BYTES = int(os.getenv("TRANSCRIPTION_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# Mongo tier entries expire this long after they were written
+CACHE_TTL_SECONDS = int(float(os.getenv("TRANSCRIPTION_CACHE_TTL_HOURS", "168")) * 3600)
+
+
+class TranscriptionCache:
+    """Size-bounded LRU of transcription results with an optional Mongo tier.
+
+    Keys combine the audio content hash with the ASR version string, so results
+    from a different model or configuration are never served.
+    """
+
+    def __init__(self, max_bytes=CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.collection = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def use_collection(self, collection, ttl_seconds=CACHE_TTL_SECONDS):
+        """Enable the Mongo-backed tier, with a TTL index bounding its size"""
+        collection.create_index("key", unique=True)
+        try:
+            collection.create_index("created_at", name="created_at_ttl", expireAfterSeconds=ttl_seconds)
+        except OperationFailure:
+            # The TTL changed since the index was created; update it in place
+            collection.database.command(
+                "collMod", collection.name,
+                index={"name": "created_at_ttl", "expireAfterSeconds": ttl_seconds}
+            )
+        self.collection = collection
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry[0]
+
+        if self.collection is None:
+            return None
+        try:
+            doc = self.collection.find_one({"key": key})
+        except Exception as e:
+            logger.error(f"Transcription cache lookup failed: {e}")
+            return None
+        if not doc:
+            return None
+
+        try:
+            result = decompress_document(doc["data"])
+        except Exception as e:
+            # A corrupt entry would fail every lookup until it expires; drop it
+            # so the next transcription replaces it
+            logger.error(f"Discarding unreadable transcription cache entry {key}: {e}")
+            try:
+                self.collection.delete_one({"key": key})
+            except Exception as e:
+                logger.error(f"Transcription cache delete failed: {e}")
+            return None
+        self._remember(key, result)
+        return result
+
+    def put(self, key, result):
+        self._remember(key, result)
+        if self.collection is None:
+            return
+        try:
+            self.collection.update_one(
+                {"key": key},
+                {"$set": {"data": compress_document(result), "created_at": datetime.datetime.utcnow()}},
+                upsert=True
+            )
+        except Exception as e:
+            logger.error(f"Transcription cache write failed: {e}")
+
+    def _remember(self, key, result):
+        size = len(json.dumps(result, default=str))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (result, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+
+
+transcription_cache = TranscriptionCache()
@@ -6,7 +6,7 @@ import { Button, CircularProgress, Typography, Box } from '@mui/material';
 const Interview = () => {
     const navigate = useNavigate();
     const [sessionData, setSessionData] = useState(null);
-    const [questionsBySkill, setQuestionsBySkill] = useState({});
+    const [skillQuestionCount, setSkillQuestionCount] = useState(0);
     const [currentSkillIndex, setCurrentSkillIndex] = useState(0);
     const [currentQIndex, setCurrentQIndex] = useState(0);
     const [interviewStarted, setInterviewStarted] = useState(false);
@@ -22,10 +22,14 @@ const Interview = () => {
     const audioChunksRef = useRef([]);
     const mediaStreamRef = useRef(null);
     const countdownRef = useRef(null);
+    const currentQuestionRef = useRef(null);
+    const initializedRef = useRef(false);
 
     useEffect(() => {
         const savedSession = localStorage.getItem('interviewSession');
-        if (savedSession) {
+        // StrictMode mounts twice in development; only start the interview once
+        if (savedSession && !initializedRef.current) {
+            initializedRef.current = true;
             const session = JSON.parse(savedSession);
             initializeInterview(session);
         }
@@ -50,20 +54,46 @@ const Interview = () => {
         }
     }, [transcript]);
 
-    const initializeInterview = (sessionData) => {
-        const formattedQuestions = {};
-        for (const skill in sessionData.questions) {
-            formattedQuestions[skill] = sessionData.questions[skill].map(q => {
-                if (typeof q === 'object' && q.question) {
-                    return q.question;
-                }
-                return q;
-            });
-        }
+    // Without a position the server hands out the next question and advances
+    // its cursor; with one it re-reads that question without advancing
+    const fetchNextQuestion = async (sessionId, position = null) => {
+        const body = { session_id: sessionId };
+        if (position !== null) body.position = position;
+
+        const response = await fetch('http://localhost:5000/next-question', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify(body)
+        });
+
+        if (!response.ok) throw new Error(`Server error: ${response.status}`);
+
+        const result = await response.json();
+        if (result.error) throw new Error(result.error);
+        return result;
+    };
+
+    const saveQuestionPosition = (position) => {
+        const savedSession = localStorage.getItem('interviewSession');
+        if (!savedSession) return;
+        const session = JSON.parse(savedSession);
+        localStorage.setItem('interviewSession', JSON.stringify({ ...session, question_position: position }));
+    };
+
+    const showQuestion = (next) => {
+        currentQuestionRef.current = next;
+        saveQuestionPosition(next.position);
+        setCurrentSkillIndex(next.skill_index);
+        setCurrentQIndex(next.question_index);
+        setSkillQuestionCount(next.skill_question_count);
+        addBotMessage(next.question, next.skill);
+    };
 
+    const initializeInterview = async (sessionData) => {
         setSessionData(sessionData);
         setSkills(sessionData.skills);
-        setQuestionsBySkill(formattedQuestions);
         setMessages([]);
         setCurrentSkillIndex(0);
         setCurrentQIndex(0);
@@ -72,16 +102,19 @@ const Interview = () => {
         setInterviewCompleted(false);
         setRecordingError(null);
 
-        const firstSkill = sessionData.skills[0];
-        const firstQuestion = formattedQuestions[firstSkill]?.[0];
-        
-        if (firstQuestion) {
-            setMessages([{
-                type: 'bot',
-                text: firstQuestion,
-                skill: firstSkill,
-                timestamp: new Date().toLocaleTimeString()
-            }]);
+        try {
+            // A reload or a return from the upload page resumes the question
+            // last shown instead of consuming a new one
+            const savedPosition = Number.isInteger(sessionData.question_position)
+                ? sessionData.question_position
+                : null;
+            const firstQuestion = await fetchNextQuestion(sessionData.session_id, savedPosition);
+            if (!firstQuestion.done) {
+                showQuestion(firstQuestion);
+            }
+        } catch (error) {
+            console.error('Question fetch error:', error);
+            setRecordingError('Failed to load interview questions');
         }
     };
 
@@ -106,25 +139,17 @@ const Interview = () => {
         setIsRedirectingToReview(false);
     };
 
-    const handleNextQuestion = () => {
-        const skillKeys = Object.keys(questionsBySkill);
-        const currentSkill = skillKeys[currentSkillIndex];
-        const questionsForSkill = questionsBySkill[currentSkill];
-
-        if (currentQIndex < questionsForSkill.length - 1) {
-            const nextQIndex = currentQIndex + 1;
-            setCurrentQIndex(nextQIndex);
-            addBotMessage(questionsForSkill[nextQIndex], currentSkill);
-        } else if (currentSkillIndex < skillKeys.length - 1) {
-            const nextSkillIndex = currentSkillIndex + 1;
-            const nextSkill = skillKeys[nextSkillIndex];
-            const nextSkillQuestions = questionsBySkill[nextSkill];
-
-            setCurrentSkillIndex(nextSkillIndex);
-            setCurrentQIndex(0);
-            addBotMessage(nextSkillQuestions[0], nextSkill);
-        } else {
-            completeInterview();
+    const handleNextQuestion = async () => {
+        try {
+            const next = await fetchNextQuestion(sessionData.session_id);
+            if (next.done) {
+                completeInterview();
+            } else {
+                showQuestion(next);
+            }
+        } catch (error) {
+            console.error('Question fetch error:', error);
+            setRecordingError('Failed to load the next question');
         }
     };
 
@@ -181,6 +206,7 @@ const Interview = () => {
                     if (result.error) throw new Error(result.error);
 
                     setTranscript(result);
+                    saveAnswer(result);
                     
                     const answerText = result.text || '[Audio response]';
                     addUserMessage(answerText);
@@ -240,6 +266,27 @@ const Interview = () => {
         }
     };
 
+    // Store each answer on the session as it happens, so a crash loses nothing
+    const saveAnswer = async (result) => {
+        try {
+            await fetch('http://localhost:5000/append-answer', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                },
+                body: JSON.stringify({
+                    session_id: sessionData.session_id || sessionData._id,
+                    question: currentQuestionRef.current?.question,
+                    skill: currentQuestionRef.current?.skill,
+                    position: currentQuestionRef.current?.position,
+                    transcript: result
+                })
+            });
+        } catch (error) {
+            console.error('Failed to save answer:', error);
+        }
+    };
+
     const cleanupMediaStream = () => {
         if (mediaStreamRef.current) {
             mediaStreamRef.current.getTracks().forEach(track => track.stop());
@@ -278,9 +325,8 @@ const Interview = () => {
         }
     
         const interviewResults = {
-            sessionId: sessionData._id,
+            sessionId: sessionData.session_id || sessionData._id,
             skills,
-            questions: questionsBySkill,
             messages,
             transcript,
             analysis: analysisResults,
@@ -330,7 +376,7 @@ const Interview = () => {
                         <h2>Mock Interview</h2>
                         <div className="progress-indicator">
                             <span>Skill {currentSkillIndex + 1} of {skills.length}</span>
-                            <span>Question {currentQIndex + 1} of {questionsBySkill[skills[currentSkillIndex]]?.length || 0}</span>
+                            <span>Question {currentQIndex + 1} of {skillQuestionCount}</span>
                         </div>
                         <div className="skill-tags">
                             {skills.map((skill, index) => (
@@ -59,6 +59,11 @@ const ResumeUpload = ({ onSessionStart }) => {
         const formData = new FormData();
         formData.append('file', file);
 
+        const storedUser = JSON.parse(localStorage.getItem('user') || 'null');
+        if (storedUser?.email) {
+            formData.append('email', storedUser.email);
+        }
+
         setLoading(true);
         setError('');
 
@@ -85,15 +90,15 @@ const ResumeUpload = ({ onSessionStart }) => {
                 config
             );
 
-            const { skills, questions, session_id } = response.data;
+            const { skills, total_questions, session_id } = response.data;
 
-            if (!skills || !questions) {
-                throw new Error('No skills or questions received from backend');
+            if (!skills || !session_id) {
+                throw new Error('No skills or session received from backend');
             }
 
             const newSessionData = {
                 skills,
-                questions,
+                totalQuestions: total_questions,
                 session_id,
                 resumeFile: file.name
             };
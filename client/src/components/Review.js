@@ -239,8 +239,24 @@ const Review = () => {
                 throw new Error('No responses to analyze');
             }
     
+            // Pair each answer with the question it was given, for relevance scoring
+            const answers = [];
+            let lastQuestion = null;
+            data.messages.forEach(msg => {
+                if (msg.type === 'bot' && msg.skill) {
+                    lastQuestion = msg;
+                } else if (msg.type === 'user' && lastQuestion) {
+                    answers.push({
+                        question: lastQuestion.text,
+                        skill: lastQuestion.skill,
+                        answer: msg.text
+                    });
+                }
+            });
+
             const payload = { 
                 text: responseText,
+                answers,
                 session_id: data.sessionId || 'unknown'  // Ensure we always pass at least 'unknown'
             };
             
@@ -313,10 +329,9 @@ const Review = () => {
                                 headers: {
                                     'Content-Type': 'application/json',
                                 },
+                                // Answers were already appended one by one during the interview
                                 body: JSON.stringify({
                                     session_id: workingData.sessionId,
-                                    messages: workingData.messages,
-                                    transcript: workingData.transcript,
                                     analysis: analysisResult
                                 }),
                             });
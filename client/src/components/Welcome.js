@@ -46,6 +46,7 @@ const Welcome = ({ setUser }) => {
       const response = await axios.post(`http://localhost:5000${endpoint}`, payload);
 
       if (response.data.user) {
+        localStorage.setItem('user', JSON.stringify(response.data.user));
         setUser(response.data.user);
         navigate('/upload');
       }